@@ -5,21 +5,79 @@ Includes demo mode fallback when API is unavailable
 """
 
 import os
-import json
-from groq import Groq
+import re
+import time
+import hashlib
+import asyncio
+import threading
+from collections import OrderedDict
+import httpx
+import orjson
+from groq import AsyncGroq
 from prompts import (
     SYSTEM_PROMPT,
     PROMPT_RESUME_UNDERSTANDING,
     PROMPT_ROLE_FIT_ANALYSIS,
     PROMPT_LEARNING_ROADMAP,
-    PROMPT_REFLECTION
+    PROMPT_REFLECTION,
+    PROMPT_FUSED_ANALYSIS
 )
-from api_key_pool import get_api_pool
+from api_key_pool import get_api_pool, cooldown_from_headers, parse_reset_seconds
+from rate_limiter import AIMDLimiter
+from semantic_cache import SEMANTIC_CACHE_ENABLED, SemanticCache, embed_prompt
 
 
 # Demo mode flag - set to True if API fails
 DEMO_MODE = False
 
+# LLM call settings (also part of the response cache key)
+LLM_MODEL = "llama-3.3-70b-versatile"
+LLM_TEMPERATURE = 0.7
+
+# Run the analysis as one fused JSON-mode call; AGENT_MULTI_STEP=1 restores
+# the original four sequential calls (kept for A/B comparison)
+AGENT_MULTI_STEP = os.environ.get("AGENT_MULTI_STEP", "") == "1"
+
+# Markdown code fences around a JSON reply (```json / ```JSON / ``` and the closing ```)
+_FENCE_RE = re.compile(r"^\s*```(?:json)?[ \t]*\n?|\n?```\s*$", re.IGNORECASE)
+
+# Exact-match response cache: {sha256 key: (expires_at, response_text)}, LRU-bounded.
+# Enabled with ENABLE_LLM_CACHE=1; entries expire after 24 hours.
+LLM_CACHE_ENABLED = os.environ.get("ENABLE_LLM_CACHE", "") == "1"
+LLM_CACHE_TTL = 24 * 3600
+LLM_CACHE_SIZE = 256
+_response_cache: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+
+# Semantic response cache: near-duplicate prompts (cosine >= threshold) reuse
+# a stored response. Enabled with ENABLE_SEMANTIC_CACHE=1.
+_semantic_cache = SemanticCache()
+
+# In-flight requests: identical concurrent prompts share one Groq call
+_inflight: dict[str, asyncio.Future] = {}
+
+# Adaptive bound on concurrent Groq calls from this worker
+_llm_limiter = AIMDLimiter()
+
+# One async Groq client per API key, reused so the pooled HTTP connections stay alive
+_CLIENTS: dict[str, AsyncGroq] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def _get_client(api_key: str) -> AsyncGroq:
+    """Return the cached async Groq client for this key, creating it on first use."""
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(api_key)
+        if client is None:
+            client = AsyncGroq(
+                api_key=api_key,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+                    timeout=httpx.Timeout(60.0),
+                ),
+            )
+            _CLIENTS[api_key] = client
+        return client
+
 
 def get_groq_client(api_key: str = None):
     """Get Groq client. Uses provided key or fetches from pool."""
@@ -28,58 +86,225 @@ def get_groq_client(api_key: str = None):
         api_key = pool.get_key()
         if not api_key:
             raise ValueError("No API keys available (all rate-limited)")
-    return Groq(api_key=api_key)
+    return _get_client(api_key)
 
 
 def parse_json_response(response_text: str) -> dict:
     """Parse JSON from LLM response, handling potential markdown formatting."""
-    text = response_text.strip()
-    
-    if text.startswith("```json"):
-        text = text[7:]
-    elif text.startswith("```"):
-        text = text[3:]
-    
-    if text.endswith("```"):
-        text = text[:-3]
-    
-    return json.loads(text.strip())
+    return orjson.loads(_FENCE_RE.sub("", response_text).strip())
+
+
+def _cache_key(prompt: str, max_tokens: int = 2048, json_mode: bool = False) -> str:
+    """Hash everything that determines the LLM output for a prompt."""
+    raw = f"{LLM_MODEL}|{LLM_TEMPERATURE}|{max_tokens}|{json_mode}|{SYSTEM_PROMPT}|{prompt}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
 
-def call_llm(prompt: str) -> str:
+async def call_llm(prompt: str, max_tokens: int = 2048, json_mode: bool = False,
+                   cache_scope: str = "") -> str:
+    """
+    Call LLaMA 3.3 via Groq API, serving repeated prompts from the
+    exact-match cache (ENABLE_LLM_CACHE=1) and near-duplicate prompts
+    from the semantic cache (ENABLE_SEMANTIC_CACHE=1).
+    json_mode asks Groq to return a single JSON object.
+    cache_scope holds prompt inputs that must match exactly for a semantic
+    cache hit (e.g. the target role); the embedding only sees the prompt's
+    first 512 tokens.
+    """
+    key = None
+    if LLM_CACHE_ENABLED:
+        key = _cache_key(prompt, max_tokens, json_mode)
+        cached = _response_cache.get(key)
+        if cached and cached[0] > time.time():
+            _response_cache.move_to_end(key)
+            print("[LLM] Cache hit")
+            return cached[1]
+        if cached:
+            del _response_cache[key]  # expired
+
+    vec = None
+    scope = f"{LLM_MODEL}|{LLM_TEMPERATURE}|{max_tokens}|{json_mode}|{cache_scope}"
+    if SEMANTIC_CACHE_ENABLED:
+        try:
+            vec = await asyncio.to_thread(embed_prompt, prompt)
+            hit = _semantic_cache.lookup(scope, vec)
+            if hit is not None:
+                print("[LLM] Semantic cache hit")
+                return hit
+        except Exception as e:
+            print(f"[LLM] Semantic cache unavailable: {e}")
+            vec = None
+
+    text = await _deduplicated_completion(
+        prompt, key or _cache_key(prompt, max_tokens, json_mode), max_tokens, json_mode
+    )
+    if key:
+        _response_cache[key] = (time.time() + LLM_CACHE_TTL, text)
+        _response_cache.move_to_end(key)
+        if len(_response_cache) > LLM_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+    if vec is not None:
+        _semantic_cache.store(scope, vec, text)
+    return text
+
+
+class _LeaderCancelled(Exception):
+    """Set on a shared in-flight future when the request that started it was cancelled."""
+
+
+async def _deduplicated_completion(prompt: str, key: str,
+                                   max_tokens: int, json_mode: bool) -> str:
+    """
+    Await an identical in-flight request if one exists, otherwise start it.
+    If the request being joined is cancelled, followers make their own call.
+    """
+    while True:
+        pending = _inflight.get(key)
+        if pending is None:
+            break
+        print("[LLM] Joining in-flight request")
+        try:
+            return await asyncio.shield(pending)
+        except _LeaderCancelled:
+            continue
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        text = await _request_completion(prompt, max_tokens, json_mode)
+        future.set_result(text)
+        return text
+    except asyncio.CancelledError:
+        future.set_exception(_LeaderCancelled())
+        future.exception()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Mark retrieved so an unjoined failure doesn't log "exception never retrieved"
+        future.exception()
+        raise
+    finally:
+        if _inflight.get(key) is future:
+            del _inflight[key]
+
+
+class _JsonCloseDetector:
+    """Tracks brace depth across streamed chunks to spot where the top-level JSON object ends."""
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, chunk: str) -> int:
+        """Consume a chunk; return the offset just past the outermost closing brace, or -1."""
+        for i, ch in enumerate(chunk):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = self.depth > 0
+            elif ch == "{":
+                self.depth += 1
+            elif ch == "}" and self.depth > 0:
+                self.depth -= 1
+                if self.depth == 0:
+                    return i + 1
+        return -1
+
+
+async def _read_json_stream(stream) -> str:
+    """
+    Collect a streamed completion, stopping as soon as the top-level JSON
+    object closes so trailing tokens (closing fences, chatter) aren't awaited.
+    """
+    parts = []
+    detector = _JsonCloseDetector()
+    try:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content or ""
+            end = detector.feed(delta)
+            if end >= 0:
+                parts.append(delta[:end])
+                break
+            parts.append(delta)
+    finally:
+        await stream.response.aclose()
+    return "".join(parts)
+
+
+async def _request_completion(prompt: str, max_tokens: int = 2048,
+                              json_mode: bool = False) -> str:
     """
     Call LLaMA 3.3 via Groq API with automatic key rotation.
     Retries with different keys on rate limit errors.
+    Plain completions are streamed and returned once the JSON object is
+    complete; Groq's JSON mode does not support streaming, so json_mode
+    requests are made without it.
     """
     pool = get_api_pool()
     last_error = None
+    extra = {"response_format": {"type": "json_object"}} if json_mode else {}
     
     # Try up to pool.total_keys times (one attempt per key)
     for attempt in range(max(pool.total_keys, 1)):
-        api_key = pool.get_key()
+        api_key = await pool.aget_key()
         if not api_key:
             break
         
         try:
-            client = Groq(api_key=api_key)
-            response = client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
+            client = _get_client(api_key)
+            request = dict(
+                model=LLM_MODEL,
                 messages=[
                     {"role": "system", "content": SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.7,
-                max_tokens=2048
+                temperature=LLM_TEMPERATURE,
+                max_tokens=max_tokens,
+                **extra
             )
+            async with _llm_limiter.slot():
+                started = time.monotonic()
+                if json_mode:
+                    raw = await client.chat.completions.with_raw_response.create(**request)
+                    headers = raw.headers
+                    text = raw.parse().choices[0].message.content
+                else:
+                    stream = await client.chat.completions.create(stream=True, **request)
+                    text = await _read_json_stream(stream)
+                    headers = stream.response.headers
+            await _llm_limiter.on_success(time.monotonic() - started)
             pool.mark_success(api_key)
-            return response.choices[0].message.content
+            
+            # Rest the key proactively if Groq says its request quota is nearly spent
+            remaining = headers.get("x-ratelimit-remaining-requests", "")
+            if remaining.isdigit():
+                pool.mark_low_capacity(
+                    api_key, int(remaining),
+                    parse_reset_seconds(headers.get("x-ratelimit-reset-requests"))
+                )
+            return text
             
         except Exception as e:
             last_error = e
             error_msg = str(e).lower()
             
-            if "rate_limit" in error_msg or "429" in error_msg:
-                pool.mark_rate_limited(api_key, cooldown_seconds=60)
+            is_rate_limit = "rate_limit" in error_msg or "429" in error_msg
+            
+            # Back off overall concurrency on throttling or provider errors
+            if is_rate_limit or (getattr(e, "status_code", None) or 0) >= 500:
+                _llm_limiter.on_failure()
+            
+            if is_rate_limit:
+                headers = getattr(getattr(e, "response", None), "headers", None)
+                pool.mark_rate_limited(api_key, cooldown_seconds=cooldown_from_headers(headers))
                 print(f"[LLM] Key ...{api_key[-6:]} rate-limited, trying next key...")
                 continue
             else:
@@ -89,63 +314,81 @@ def call_llm(prompt: str) -> str:
     raise Exception(f"All API keys exhausted. Last error: {last_error}")
 
 
+# ── Demo Mode Vocabulary ─────────────────────────────────────────────────────
+
+# Tuples, built once at import — get_demo_analysis only reads them
+
+# Common tech keywords reported as found skills
+DEMO_SKILLS = (
+    "python", "javascript", "react", "node.js", "sql", "html", "css",
+    "java", "c++", "git", "docker", "aws", "azure", "machine learning",
+    "data analysis", "excel", "tableau", "power bi", "pandas", "numpy",
+    "tensorflow", "pytorch", "api", "rest", "mongodb", "postgresql",
+    "agile", "scrum", "leadership", "communication", "problem solving"
+)
+
+# Role-specific requirements
+DEMO_ROLE_REQUIREMENTS = {
+    "Frontend Developer": {
+        "core": ("react", "javascript", "html", "css", "typescript", "vue.js"),
+        "supporting": ("git", "testing", "responsive design", "api integration")
+    },
+    "Data Analyst": {
+        "core": ("sql", "python", "excel", "data visualization", "statistics"),
+        "supporting": ("tableau", "power bi", "pandas", "machine learning basics")
+    },
+    "Backend Developer": {
+        "core": ("python", "java", "sql", "api", "database design"),
+        "supporting": ("docker", "aws", "microservices", "security")
+    },
+    "Full Stack Developer": {
+        "core": ("javascript", "react", "node.js", "sql", "api"),
+        "supporting": ("docker", "git", "cloud services", "devops")
+    },
+    "Machine Learning Engineer": {
+        "core": ("python", "machine learning", "tensorflow", "pandas"),
+        "supporting": ("docker", "aws", "mlops", "statistics")
+    },
+    "DevOps Engineer": {
+        "core": ("docker", "kubernetes", "aws", "ci/cd", "linux"),
+        "supporting": ("python", "terraform", "monitoring", "security")
+    },
+    "Product Manager": {
+        "core": ("product strategy", "user research", "roadmapping", "agile"),
+        "supporting": ("sql", "analytics", "communication", "leadership")
+    },
+    "UX Designer": {
+        "core": ("figma", "user research", "wireframing", "prototyping"),
+        "supporting": ("html", "css", "usability testing", "design systems")
+    }
+}
+
+# Extra terms that only drive the generated strengths
+DEMO_SIGNAL_TERMS = ("leadership", "led", "managed", "project", "agile", "scrum")
+
+# Every term the demo analysis looks for, deduplicated so none is searched for
+# twice. This is still one substring search per term, not a single pass: a
+# compiled alternation regex measured slower than these `in` checks.
+_DEMO_VOCABULARY = frozenset(DEMO_SKILLS + DEMO_SIGNAL_TERMS).union(
+    *(reqs["core"] + reqs["supporting"] for reqs in DEMO_ROLE_REQUIREMENTS.values())
+)
+
+
 def get_demo_analysis(resume_text: str, target_role: str) -> dict:
     """Generate a demo analysis based on simple keyword matching."""
     
     resume_lower = resume_text.lower()
     
-    # Extract skills by looking for common tech keywords
-    all_skills = [
-        "python", "javascript", "react", "node.js", "sql", "html", "css",
-        "java", "c++", "git", "docker", "aws", "azure", "machine learning",
-        "data analysis", "excel", "tableau", "power bi", "pandas", "numpy",
-        "tensorflow", "pytorch", "api", "rest", "mongodb", "postgresql",
-        "agile", "scrum", "leadership", "communication", "problem solving"
-    ]
+    # One substring search per vocabulary term; later checks are set lookups
+    matched = {term for term in _DEMO_VOCABULARY if term in resume_lower}
     
-    found_skills = [skill for skill in all_skills if skill in resume_lower]
-    
-    # Role-specific requirements
-    role_requirements = {
-        "Frontend Developer": {
-            "core": ["react", "javascript", "html", "css", "typescript", "vue.js"],
-            "supporting": ["git", "testing", "responsive design", "api integration"]
-        },
-        "Data Analyst": {
-            "core": ["sql", "python", "excel", "data visualization", "statistics"],
-            "supporting": ["tableau", "power bi", "pandas", "machine learning basics"]
-        },
-        "Backend Developer": {
-            "core": ["python", "java", "sql", "api", "database design"],
-            "supporting": ["docker", "aws", "microservices", "security"]
-        },
-        "Full Stack Developer": {
-            "core": ["javascript", "react", "node.js", "sql", "api"],
-            "supporting": ["docker", "git", "cloud services", "devops"]
-        },
-        "Machine Learning Engineer": {
-            "core": ["python", "machine learning", "tensorflow", "pandas"],
-            "supporting": ["docker", "aws", "mlops", "statistics"]
-        },
-        "DevOps Engineer": {
-            "core": ["docker", "kubernetes", "aws", "ci/cd", "linux"],
-            "supporting": ["python", "terraform", "monitoring", "security"]
-        },
-        "Product Manager": {
-            "core": ["product strategy", "user research", "roadmapping", "agile"],
-            "supporting": ["sql", "analytics", "communication", "leadership"]
-        },
-        "UX Designer": {
-            "core": ["figma", "user research", "wireframing", "prototyping"],
-            "supporting": ["html", "css", "usability testing", "design systems"]
-        }
-    }
+    found_skills = [skill for skill in DEMO_SKILLS if skill in matched]
     
-    role_reqs = role_requirements.get(target_role, role_requirements["Frontend Developer"])
+    role_reqs = DEMO_ROLE_REQUIREMENTS.get(target_role, DEMO_ROLE_REQUIREMENTS["Frontend Developer"])
     
     # Calculate role fit score
-    core_match = len([s for s in role_reqs["core"] if s in resume_lower])
-    supporting_match = len([s for s in role_reqs["supporting"] if s in resume_lower])
+    core_match = len(matched.intersection(role_reqs["core"]))
+    supporting_match = len(matched.intersection(role_reqs["supporting"]))
     
     total_core = len(role_reqs["core"])
     total_supporting = len(role_reqs["supporting"])
@@ -154,20 +397,20 @@ def get_demo_analysis(resume_text: str, target_role: str) -> dict:
     score = max(25, min(95, score + 20))  # Normalize between 25-95
     
     # Find missing skills
-    missing_core = [s for s in role_reqs["core"] if s not in resume_lower]
-    missing_supporting = [s for s in role_reqs["supporting"] if s not in resume_lower]
+    missing_core = [s for s in role_reqs["core"] if s not in matched]
+    missing_supporting = [s for s in role_reqs["supporting"] if s not in matched]
     
     # Generate strengths based on found skills
     strengths = []
     if found_skills:
         strengths.append(f"Technical proficiency in {', '.join(found_skills[:3])}")
-    if "leadership" in resume_lower or "led" in resume_lower or "managed" in resume_lower:
+    if "leadership" in matched or "led" in matched or "managed" in matched:
         strengths.append("Leadership and team management experience")
-    if "project" in resume_lower:
+    if "project" in matched:
         strengths.append("Project delivery experience")
     if len(found_skills) > 5:
         strengths.append("Diverse technical skill set")
-    if "agile" in resume_lower or "scrum" in resume_lower:
+    if "agile" in matched or "scrum" in matched:
         strengths.append("Agile methodology experience")
     
     if not strengths:
@@ -217,47 +460,71 @@ def get_demo_analysis(resume_text: str, target_role: str) -> dict:
     }
 
 
+async def _run_multi_step(resume_text: str, target_role: str) -> tuple:
+    """Original four sequential LLM calls (enabled with AGENT_MULTI_STEP=1)."""
+    # Step 1: Understand the resume
+    print("Agent Step 1: Resume Understanding (LLaMA 3.1)...")
+    prompt1 = PROMPT_RESUME_UNDERSTANDING.substitute(resume_text=resume_text)
+    response1 = await call_llm(prompt1)
+    resume_understanding = parse_json_response(response1)
+    
+    # Step 2: Analyze role fit
+    print("Agent Step 2: Role Fit Analysis (LLaMA 3.1)...")
+    prompt2 = PROMPT_ROLE_FIT_ANALYSIS.substitute(
+        skills=", ".join(resume_understanding.get("skills", [])),
+        education_level=resume_understanding.get("education_level", "Unknown"),
+        experience_level=resume_understanding.get("experience_level", "Unknown"),
+        strengths=", ".join(resume_understanding.get("strengths", [])),
+        target_role=target_role
+    )
+    response2 = await call_llm(prompt2, cache_scope=target_role)
+    role_fit_analysis = parse_json_response(response2)
+    
+    # Step 3: Generate learning roadmap
+    print("Agent Step 3: Learning Roadmap (LLaMA 3.1)...")
+    prompt3 = PROMPT_LEARNING_ROADMAP.substitute(
+        missing_core_skills=", ".join(role_fit_analysis.get("missing_core_skills", [])),
+        missing_supporting_skills=", ".join(role_fit_analysis.get("missing_supporting_skills", [])),
+        target_role=target_role
+    )
+    response3 = await call_llm(prompt3, cache_scope=target_role)
+    learning_roadmap = parse_json_response(response3)
+    
+    # Step 4: Reflection
+    print("Agent Step 4: Reflection (LLaMA 3.1)...")
+    prompt4 = PROMPT_REFLECTION.substitute(
+        role_fit_score=role_fit_analysis.get("role_fit_score", 0),
+        roadmap_count=len(learning_roadmap.get("roadmap", [])),
+        target_role=target_role
+    )
+    response4 = await call_llm(prompt4, cache_scope=target_role)
+    reflection = parse_json_response(response4)
+    
+    return resume_understanding, role_fit_analysis, learning_roadmap, reflection
+
+
+async def _run_fused(resume_text: str, target_role: str) -> tuple:
+    """All four steps in one JSON-mode LLM call."""
+    print("Agent: Fused Analysis — understanding, role fit, roadmap, reflection (LLaMA 3.1)...")
+    prompt = PROMPT_FUSED_ANALYSIS.substitute(resume_text=resume_text, target_role=target_role)
+    response = await call_llm(prompt, max_tokens=4096, json_mode=True, cache_scope=target_role)
+    result = parse_json_response(response)
+    
+    return (
+        result.get("resume_understanding", {}),
+        result.get("role_fit_analysis", {}),
+        result.get("learning_roadmap", {}),
+        result.get("reflection", {}),
+    )
+
+
 async def run_agent(resume_text: str, target_role: str) -> dict:
     """Run the agentic analysis loop using Groq/LLaMA."""
     
     try:
-        # Step 1: Understand the resume
-        print("Agent Step 1: Resume Understanding (LLaMA 3.1)...")
-        prompt1 = PROMPT_RESUME_UNDERSTANDING.format(resume_text=resume_text)
-        response1 = call_llm(prompt1)
-        resume_understanding = parse_json_response(response1)
-        
-        # Step 2: Analyze role fit
-        print("Agent Step 2: Role Fit Analysis (LLaMA 3.1)...")
-        prompt2 = PROMPT_ROLE_FIT_ANALYSIS.format(
-            skills=", ".join(resume_understanding.get("skills", [])),
-            education_level=resume_understanding.get("education_level", "Unknown"),
-            experience_level=resume_understanding.get("experience_level", "Unknown"),
-            strengths=", ".join(resume_understanding.get("strengths", [])),
-            target_role=target_role
-        )
-        response2 = call_llm(prompt2)
-        role_fit_analysis = parse_json_response(response2)
-        
-        # Step 3: Generate learning roadmap
-        print("Agent Step 3: Learning Roadmap (LLaMA 3.1)...")
-        prompt3 = PROMPT_LEARNING_ROADMAP.format(
-            missing_core_skills=", ".join(role_fit_analysis.get("missing_core_skills", [])),
-            missing_supporting_skills=", ".join(role_fit_analysis.get("missing_supporting_skills", [])),
-            target_role=target_role
-        )
-        response3 = call_llm(prompt3)
-        learning_roadmap = parse_json_response(response3)
-        
-        # Step 4: Reflection
-        print("Agent Step 4: Reflection (LLaMA 3.1)...")
-        prompt4 = PROMPT_REFLECTION.format(
-            role_fit_score=role_fit_analysis.get("role_fit_score", 0),
-            roadmap_count=len(learning_roadmap.get("roadmap", [])),
-            target_role=target_role
-        )
-        response4 = call_llm(prompt4)
-        reflection = parse_json_response(response4)
+        run_steps = _run_multi_step if AGENT_MULTI_STEP else _run_fused
+        resume_understanding, role_fit_analysis, learning_roadmap, reflection = \
+            await run_steps(resume_text, target_role)
         
         print("✓ Agent analysis complete (powered by LLaMA 3.1 via Groq)")
         
@@ -5,10 +5,57 @@ Auto-skips rate-limited keys and falls back gracefully.
 """
 
 import os
+import re
 import time
+import asyncio
+import heapq
 import threading
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
+
+
+# A key with fewer remaining requests than this is rested until its quota resets
+LOW_CAPACITY_THRESHOLD = 2
+
+# Groq reports resets as Go-style durations, e.g. "2m59.56s", "7.66s", "420ms"
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+
+
+def parse_reset_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After / x-ratelimit-reset-* header value into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(n) * _DURATION_UNITS[unit] for n, unit in parts)
+
+
+def cooldown_from_headers(headers, default: float = 60) -> float:
+    """
+    Cooldown for a rate-limited key based on the 429 response headers.
+    Prefers Retry-After, then the longest x-ratelimit-reset-* value,
+    and falls back to `default` when neither is present.
+    """
+    if not headers:
+        return default
+    retry_after = parse_reset_seconds(headers.get("retry-after"))
+    if retry_after is not None:
+        return retry_after
+    resets = [
+        seconds for seconds in (
+            parse_reset_seconds(headers.get("x-ratelimit-reset-requests")),
+            parse_reset_seconds(headers.get("x-ratelimit-reset-tokens")),
+        )
+        if seconds is not None
+    ]
+    return max(resets) if resets else default
 
 
 class APIKeyPool:
@@ -27,43 +74,54 @@ class APIKeyPool:
         # Track rate-limited keys: {key: cooldown_until_timestamp}
         self._cooldowns = {}
         self._usage_counts = {}
+        self._total_calls = 0
+        # Min-heaps with lazy deletion (stale entries are skipped when popped):
+        #   _usage_heap    : (usage_count, load_order, key) for keys off cooldown
+        #   _cooldown_heap : (cooldown_until, key) for keys on cooldown
+        self._usage_heap = []
+        self._cooldown_heap = []
+        self._order = {}
         self._load_keys()
     
     def _load_keys(self):
         """Load API keys from environment variables and keys file."""
+        env = os.environ
+        seen = set()
+        
+        def add(key: str):
+            key = key.strip()
+            if key and key not in seen:
+                seen.add(key)
+                self._keys.append(key)
+        
         # Primary key from env
-        primary = os.environ.get("GROQ_API_KEY", "")
-        if primary:
-            self._keys.append(primary)
+        add(env.get("GROQ_API_KEY", ""))
         
         # Additional keys: GROQ_API_KEY_2, GROQ_API_KEY_3, etc.
         for i in range(2, 11):
-            key = os.environ.get(f"GROQ_API_KEY_{i}", "")
-            if key:
-                self._keys.append(key)
+            add(env.get(f"GROQ_API_KEY_{i}", ""))
         
         # Comma-separated keys in GROQ_API_KEYS
-        multi = os.environ.get("GROQ_API_KEYS", "")
-        if multi:
-            for key in multi.split(","):
-                key = key.strip()
-                if key and key not in self._keys:
-                    self._keys.append(key)
+        for key in env.get("GROQ_API_KEYS", "").split(","):
+            add(key)
         
-        # Load from keys file (one key per line)
+        # Load from keys file (one key per line); a missing file is the common case
         keys_file = Path(__file__).parent / "keys"
-        if keys_file.exists():
-            try:
-                for line in keys_file.read_text(encoding="utf-8").splitlines():
-                    key = line.strip()
-                    if key and not key.startswith("#") and key not in self._keys:
-                        self._keys.append(key)
-            except Exception as e:
-                print(f"[APIKeyPool] Warning: Could not read keys file: {e}")
+        try:
+            for line in keys_file.read_text(encoding="utf-8").splitlines():
+                if not line.strip().startswith("#"):
+                    add(line)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[APIKeyPool] Warning: Could not read keys file: {e}")
         
         # Initialize usage counts
-        for key in self._keys:
+        for i, key in enumerate(self._keys):
             self._usage_counts[key] = 0
+            self._order[key] = i
+            self._usage_heap.append((0, i, key))
+        heapq.heapify(self._usage_heap)
         
         print(f"[APIKeyPool] Loaded {len(self._keys)} API key(s)")
     
@@ -71,79 +129,118 @@ class APIKeyPool:
     def total_keys(self) -> int:
         return len(self._keys)
     
+    def _release_expired(self, now: float):
+        """Move keys whose cooldown has passed back into the usage heap. Caller holds the lock."""
+        heap = self._cooldown_heap
+        while heap and heap[0][0] <= now:
+            until, key = heapq.heappop(heap)
+            if self._cooldowns.get(key) == until:
+                del self._cooldowns[key]
+                heapq.heappush(self._usage_heap, (self._usage_counts[key], self._order[key], key))
+
+    def _soonest_cooldown(self) -> Optional[float]:
+        """Earliest pending cooldown expiry, skipping stale heap entries. Caller holds the lock."""
+        heap = self._cooldown_heap
+        while heap and self._cooldowns.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
     @property
     def available_keys(self) -> int:
         """Number of keys not currently rate-limited."""
-        now = time.time()
         with self._lock:
-            return sum(
-                1 for k in self._keys
-                if self._cooldowns.get(k, 0) <= now
-            )
+            self._release_expired(time.time())
+            return len(self._keys) - len(self._cooldowns)
     
     def has_available_key(self) -> bool:
         """Check if any API key is available WITHOUT consuming a rotation."""
         return self.available_keys > 0 or bool(os.environ.get("GROQ_API_KEY"))
     
-    def get_key(self) -> Optional[str]:
+    def _pick_now(self) -> Tuple[Optional[str], Optional[float]]:
         """
-        Get the best available API key.
-        Returns the least-used key that's not on cooldown.
-        Returns None if all keys are rate-limited.
+        Try to take a key without waiting.
+        Returns (key, None) on success, (None, wait_seconds) if a cooldown
+        expires within 5 seconds, or (None, None) if nothing is coming back soon.
         """
         now = time.time()
         
         with self._lock:
-            # Filter out keys on cooldown
-            available = [
-                k for k in self._keys
-                if self._cooldowns.get(k, 0) <= now
-            ]
+            self._release_expired(now)
             
-            if not available:
-                # Check if any cooldown is about to expire (within 5 seconds)
-                soonest = None
-                for k in self._keys:
-                    cd = self._cooldowns.get(k, 0)
-                    if cd > now and (soonest is None or cd < soonest):
-                        soonest = cd
-                
-                if soonest and (soonest - now) <= 5:
-                    # Wait for the soonest key
-                    time.sleep(soonest - now + 0.1)
-                    return self.get_key()
-                
-                return None
+            # Pop until the top entry is current (count matches, key not on cooldown)
+            heap = self._usage_heap
+            while heap:
+                count, order, best = heapq.heappop(heap)
+                if best in self._cooldowns or count != self._usage_counts[best]:
+                    continue
+                # Lowest usage count wins (round-robin effect)
+                self._usage_counts[best] = count + 1
+                self._total_calls += 1
+                heapq.heappush(heap, (count + 1, order, best))
+                return best, None
             
-            # Pick the key with lowest usage count (round-robin effect)
-            best = min(available, key=lambda k: self._usage_counts.get(k, 0))
-            self._usage_counts[best] = self._usage_counts.get(best, 0) + 1
-            return best
+            # Check if any cooldown is about to expire (within 5 seconds)
+            soonest = self._soonest_cooldown()
+        
+        if soonest and (soonest - now) <= 5:
+            return None, soonest - now + 0.1
+        return None, None
+    
+    def get_key(self) -> Optional[str]:
+        """
+        Get the best available API key.
+        Returns the least-used key that's not on cooldown.
+        Returns None if all keys are rate-limited.
+        Blocks the calling thread while waiting for a key about to recover;
+        async callers should use aget_key() instead.
+        """
+        while True:
+            key, wait = self._pick_now()
+            if key or wait is None:
+                return key
+            time.sleep(wait)
+    
+    async def aget_key(self) -> Optional[str]:
+        """Async get_key(): waits for a recovering key without blocking the event loop."""
+        while True:
+            key, wait = self._pick_now()
+            if key or wait is None:
+                return key
+            await asyncio.sleep(wait)
     
-    def mark_rate_limited(self, key: str, cooldown_seconds: int = 60):
+    def mark_rate_limited(self, key: str, cooldown_seconds: float = 60):
         """Mark a key as rate-limited for a cooldown period."""
         with self._lock:
-            self._cooldowns[key] = time.time() + cooldown_seconds
-            remaining = self.available_keys
-            print(f"[APIKeyPool] Key ...{key[-6:]} rate-limited for {cooldown_seconds}s. "
+            if key in self._order:
+                until = time.time() + cooldown_seconds
+                self._cooldowns[key] = until
+                heapq.heappush(self._cooldown_heap, (until, key))
+            remaining = len(self._keys) - len(self._cooldowns)
+            print(f"[APIKeyPool] Key ...{key[-6:]} rate-limited for {cooldown_seconds:g}s. "
                   f"{remaining}/{self.total_keys} keys available.")
     
     def mark_success(self, key: str):
         """Record a successful API call (resets any pending cooldown)."""
         with self._lock:
             if key in self._cooldowns and self._cooldowns[key] > time.time():
-                # Key recovered early
+                # Key recovered early; its cooldown heap entry is now stale
                 del self._cooldowns[key]
+                heapq.heappush(self._usage_heap, (self._usage_counts[key], self._order[key], key))
+    
+    def mark_low_capacity(self, key: str, remaining: int, reset_seconds: Optional[float]):
+        """Rest a key until its quota resets when almost no requests remain on it."""
+        if remaining < LOW_CAPACITY_THRESHOLD and reset_seconds:
+            self.mark_rate_limited(key, cooldown_seconds=reset_seconds)
     
     def get_stats(self) -> dict:
         """Get pool statistics."""
-        now = time.time()
         with self._lock:
+            self._release_expired(time.time())
             return {
                 "total_keys": self.total_keys,
-                "available_keys": sum(1 for k in self._keys if self._cooldowns.get(k, 0) <= now),
-                "rate_limited": sum(1 for k in self._keys if self._cooldowns.get(k, 0) > now),
-                "total_calls": sum(self._usage_counts.values()),
+                "available_keys": len(self._keys) - len(self._cooldowns),
+                "rate_limited": len(self._cooldowns),
+                "total_calls": self._total_calls,
             }
 
 
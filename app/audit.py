@@ -14,9 +14,32 @@ Tracked actions:
     LOGIN
     UPLOAD_RESUME
     UPDATE_PROFILE
+
+Buffering:
+    Once start_audit_writer() has run (app startup), log_action only queues
+    the entry; a background task writes queued entries to Firestore in
+    batches of up to AUDIT_BATCH_SIZE, at least every AUDIT_FLUSH_INTERVAL
+    seconds. stop_audit_writer() flushes whatever is left on shutdown.
+    Without a running writer, entries are written in a worker thread. Once
+    AUDIT_QUEUE_SIZE entries are waiting, new ones are dropped and counted
+    rather than stalling the event loop on a Firestore round trip.
 """
 
-from firestore_db import save_audit_log
+import asyncio
+import functools
+from datetime import datetime, timezone
+
+from firestore_db import save_audit_log, save_audit_logs
+
+
+AUDIT_BATCH_SIZE = 500        # Firestore's per-batch write limit
+AUDIT_FLUSH_INTERVAL = 1.0    # seconds
+AUDIT_QUEUE_SIZE = 10_000     # backlog cap; overflow is dropped and counted
+
+_queue: asyncio.Queue | None = None
+_writer: asyncio.Task | None = None
+_dropped = 0  # entries lost to a full queue since startup
+_STOP = object()  # queue sentinel: flush what's collected and exit
 
 
 def log_action(uid: str, action: str, details: str = "") -> None:
@@ -30,8 +53,92 @@ def log_action(uid: str, action: str, details: str = "") -> None:
 
     Errors are suppressed so audit failures never break main request flow.
     """
+    global _dropped
     try:
-        save_audit_log(uid=uid, action=action, details=details)
+        if _queue is None:
+            _write_in_background(uid, action, details)
+            return
+        _queue.put_nowait({
+            "uid":       uid,
+            "action":    action,
+            "details":   details,
+            "timestamp": datetime.now(timezone.utc),
+        })
+    except asyncio.QueueFull:
+        _dropped += 1
+        if _dropped == 1 or _dropped % 1000 == 0:
+            print(f"[Audit] Warning: queue full, {_dropped} audit log(s) dropped so far")
     except Exception as e:
         # Log to console but don't raise — auditing must never break the app
         print(f"[Audit] Warning: could not log action '{action}' for uid '{uid}': {e}")
+
+
+def _write_in_background(uid: str, action: str, details: str) -> None:
+    """Write one entry without a writer: off the event loop when called from one."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        save_audit_log(uid=uid, action=action, details=details)  # no loop to stall
+        return
+    future = loop.run_in_executor(None, functools.partial(
+        save_audit_log, uid=uid, action=action, details=details))
+    future.add_done_callback(_report_write_error)
+
+
+def _report_write_error(future: asyncio.Future) -> None:
+    """Done-callback for _write_in_background: log a failed write, never raise."""
+    if not future.cancelled() and future.exception() is not None:
+        print(f"[Audit] Warning: could not write audit log: {future.exception()}")
+
+
+async def _flush(entries: list[dict]) -> None:
+    """Write one batch off the event loop; failures are logged, not raised."""
+    try:
+        await asyncio.to_thread(save_audit_logs, entries)
+    except Exception as e:
+        print(f"[Audit] Warning: could not write {len(entries)} audit log(s): {e}")
+
+
+async def _run_writer() -> None:
+    """Drain the queue: wait for one entry, then collect more until the batch is full or the interval ends."""
+    loop = asyncio.get_running_loop()
+    while True:
+        entry = await _queue.get()
+        if entry is _STOP:
+            return
+        entries = [entry]
+        stopping = False
+        deadline = loop.time() + AUDIT_FLUSH_INTERVAL
+        while len(entries) < AUDIT_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                entry = await asyncio.wait_for(_queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if entry is _STOP:
+                stopping = True
+                break
+            entries.append(entry)
+        await _flush(entries)
+        if stopping:
+            return
+
+
+def start_audit_writer() -> None:
+    """Start the background batch writer (call from app startup)."""
+    global _queue, _writer
+    if _writer is None:
+        _queue = asyncio.Queue(maxsize=AUDIT_QUEUE_SIZE)
+        _writer = asyncio.create_task(_run_writer())
+
+
+async def stop_audit_writer() -> None:
+    """Flush everything queued so far, then stop the writer (call from app shutdown)."""
+    global _queue, _writer
+    if _writer is None:
+        return
+    await _queue.put(_STOP)
+    await _writer
+    _queue, _writer = None, None
@@ -10,10 +10,14 @@ IMPORTANT:
   - Upload file.read() bytes, NOT the FastAPI UploadFile object
   - Always set resource_type="raw" for PDFs and DOCX files
   - Check file size BEFORE uploading to avoid timeout on large files
+    (read in chunks so oversized files are rejected before being fully buffered)
 """
 
 import os
 import io
+import asyncio
+import hashlib
+from collections import OrderedDict
 import cloudinary
 import cloudinary.uploader
 from fastapi import HTTPException, status
@@ -37,11 +41,42 @@ ALLOWED_TYPES = {
 }
 
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5 MB
+READ_CHUNK_SIZE = 64 * 1024       # 64 KB per read while checking the size limit
+
+
+class _SafeNameTable(dict):
+    """
+    str.translate table for public_ids: keeps alphanumerics, '-' and '_',
+    maps everything else to '_'. Code points are classified on first sight
+    and cached, so non-ASCII names behave exactly like str.isalnum().
+    """
+
+    def __missing__(self, codepoint: int) -> int:
+        ch = chr(codepoint)
+        value = codepoint if ch.isalnum() or ch in "-_" else ord("_")
+        self[codepoint] = value
+        return value
+
+
+_SAFE_NAME_TABLE = _SafeNameTable()
+
+# Recently uploaded resumes: {content-addressed public_id: secure_url}
+# Re-analysing the same file returns the stored URL instead of re-uploading.
+UPLOAD_CACHE_SIZE = 1024
+_upload_cache: "OrderedDict[str, str]" = OrderedDict()
 
 
 # ── Initialize Cloudinary (once at import) ───────────────────────────────────
 
+# Set once cloudinary.config() has succeeded, so re-imports never reconfigure
+_configured = False
+
+
 def _init_cloudinary():
+    global _configured
+    if _configured:
+        return
+
     # Strip whitespace from keys to prevent Railway paste errors
     cloud_name = (os.environ.get("CLOUDINARY_CLOUD_NAME") or "").strip()
     api_key = (os.environ.get("CLOUDINARY_API_KEY") or "").strip()
@@ -58,6 +93,7 @@ def _init_cloudinary():
             api_secret=api_secret,
             secure=True,
         )
+        _configured = True
         print("[Cloudinary] Configured ✓")
     except Exception as e:
         print(f"[Cloudinary] Error: Failed to configure Cloudinary: {e}")
@@ -90,27 +126,38 @@ async def upload_resume(file) -> str:
             detail=f"Invalid file type '{content_type}'. Allowed: PDF, DOCX.",
         )
 
-    # 2. Reset pointer and read file as bytes
+    # 2-3. Reset pointer and read in chunks, rejecting as soon as the size limit is
+    #      passed so an oversized upload is never fully buffered in memory
     await file.seek(0)
-    file_bytes = await file.read()
-
-    # 3. Validate file size (must happen AFTER reading)
-    if len(file_bytes) > MAX_FILE_SIZE:
-        size_mb = len(file_bytes) / (1024 * 1024)
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large ({size_mb:.1f} MB). Maximum allowed is 5 MB.",
-        )
-
-    # 4. Derive a clean public_id (When using auto, Cloudinary handles extensions better)
+    buf = bytearray()
+    while chunk := await file.read(READ_CHUNK_SIZE):
+        buf.extend(chunk)
+        if len(buf) > MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File too large. Maximum allowed is 5 MB.",
+            )
+    file_bytes = bytes(buf)
+
+    # 4. Derive a clean public_id (When using auto, Cloudinary handles extensions better).
+    #    The content hash suffix means different files never share a public_id,
+    #    so identical bytes can safely reuse an earlier upload.
     original_name = (file.filename or "resume").rsplit(".", 1)[0]
-    safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in original_name)
+    digest = hashlib.sha256(file_bytes).hexdigest()[:16]
+    safe_name = f"{original_name.translate(_SAFE_NAME_TABLE)}_{digest}"
+
+    cached_url = _upload_cache.get(safe_name)
+    if cached_url:
+        _upload_cache.move_to_end(safe_name)
+        print(f"[Cloudinary] Reusing existing upload for '{file.filename}' ({safe_name})")
+        return cached_url
     
     print(f"[Cloudinary] Uploading {len(file_bytes)} bytes for '{file.filename}' as {safe_name}")
 
-    # 5. Upload bytes to Cloudinary
+    # 5. Upload bytes to Cloudinary (blocking SDK call → worker thread, keeps the event loop free)
     try:
-        result = cloudinary.uploader.upload(
+        result = await asyncio.to_thread(
+            cloudinary.uploader.upload,
             io.BytesIO(file_bytes),
             public_id=safe_name,
             folder="career-copilot/resumes",
@@ -125,4 +172,8 @@ async def upload_resume(file) -> str:
             detail=f"Cloudinary upload failed: {str(e)}",
         )
 
+    _upload_cache[safe_name] = result["secure_url"]
+    if len(_upload_cache) > UPLOAD_CACHE_SIZE:
+        _upload_cache.popitem(last=False)
+
     return result["secure_url"]
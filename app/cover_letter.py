@@ -3,24 +3,51 @@ Cover Letter Generator
 Uses LLaMA 3.3 + Embeddings for personalized cover letters with JD match analysis
 """
 
+import re
+import time
+import asyncio
+import hashlib
+import functools
+from collections import OrderedDict
 from typing import Dict, Any
 
 
-def generate_cover_letter(resume_text: str, job_description: str, 
-                          company_name: str, position: str,
-                          candidate_name: str = "Candidate") -> Dict[str, Any]:
+# Generated letters: {blake2b(inputs): (expires_at, result)}, LRU-bounded.
+# Identical resume/JD/company/position/name requests reuse the LLaMA result
+# instead of spending another multi-second, quota-consuming call.
+LETTER_CACHE_TTL = 24 * 3600
+LETTER_CACHE_SIZE = 256
+_letter_cache: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+
+
+def _letter_key(*fields: str) -> str:
+    """Content hash of the request fields that determine the letter."""
+    return hashlib.blake2b("|".join(fields).encode("utf-8"), digest_size=20).hexdigest()
+
+
+async def generate_cover_letter(resume_text: str, job_description: str, 
+                                company_name: str, position: str,
+                                candidate_name: str = "Candidate") -> Dict[str, Any]:
     """
     Generate a personalized cover letter.
     Uses LLaMA 3.3 via Groq, falls back to demo mode if unavailable.
+    The blocking LLaMA pipeline runs in a worker thread so the event loop stays free.
+    Successful LLaMA results are cached per request content; demo letters are not.
     """
-    
+    key = _letter_key(resume_text, job_description, company_name, position, candidate_name)
+    hit = _letter_cache.get(key)
+    if hit and hit[0] > time.time():
+        _letter_cache.move_to_end(key)
+        return dict(hit[1])
+
     # Try LLaMA + Embeddings (best quality)
     from api_key_pool import get_api_pool
     has_key = get_api_pool().has_available_key()
     if has_key:
         try:
             from llama_analyzer import generate_cover_letter_llama
-            result = generate_cover_letter_llama(
+            result = await asyncio.to_thread(
+                generate_cover_letter_llama,
                 resume_text=resume_text,
                 job_description=job_description,
                 company_name=company_name,
@@ -28,7 +55,11 @@ def generate_cover_letter(resume_text: str, job_description: str,
                 candidate_name=candidate_name
             )
             if result.get("success"):
-                return result
+                _letter_cache[key] = (time.time() + LETTER_CACHE_TTL, result)
+                _letter_cache.move_to_end(key)
+                if len(_letter_cache) > LETTER_CACHE_SIZE:
+                    _letter_cache.popitem(last=False)
+                return dict(result)
         except Exception as e:
             print(f"LLaMA cover letter failed: {e}")
     
@@ -37,22 +68,32 @@ def generate_cover_letter(resume_text: str, job_description: str,
                                        company_name, position, candidate_name)
 
 
-def generate_demo_cover_letter(resume_text: str, job_description: str,
-                                company_name: str, position: str,
-                                candidate_name: str) -> Dict[str, Any]:
-    """Fallback cover letter when APIs unavailable."""
-    
-    # Simple keyword extraction
-    resume_lower = resume_text.lower()
-    
-    skills = []
-    for skill in ['python', 'java', 'javascript', 'react', 'machine learning', 'sql', 'aws']:
-        if skill in resume_lower:
-            skills.append(skill.title())
-    
+# Demo skills in display order → title used in the letter
+_SKILL_TITLES = {
+    "python": "Python", "java": "Java", "javascript": "Javascript", "react": "React",
+    "machine learning": "Machine Learning", "sql": "Sql", "aws": "Aws",
+}
+
+# One pass over the resume finds every demo skill as a whole word
+_SKILL_PATTERN = re.compile(
+    r"\b(python|javascript|java|react|machine\s+learning|sql|aws)\b", re.IGNORECASE
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _extract_skills(resume_text: str) -> tuple:
+    """Title-cased demo skills found in the resume (memoized per resume text)."""
+    found = {" ".join(m.lower().split()) for m in _SKILL_PATTERN.findall(resume_text)}
+    return tuple(title for skill, title in _SKILL_TITLES.items() if skill in found)
+
+
+@functools.lru_cache(maxsize=1024)
+def _build_demo_letter(skills: tuple, company_name: str, position: str,
+                       candidate_name: str) -> str:
+    """Render the demo letter text; identical inputs return the cached string."""
     skills_text = ", ".join(skills[:4]) if skills else "relevant technical skills"
     
-    cover_letter = f"""Dear Hiring Manager,
+    return f"""Dear Hiring Manager,
 
 I am writing to express my strong interest in the {position} position at {company_name}. With my background in {skills_text}, I am excited about the opportunity to contribute to your team.
 
@@ -65,6 +106,15 @@ I would welcome the opportunity to discuss how my experience can contribute to {
 Sincerely,
 {candidate_name}"""
 
+
+def generate_demo_cover_letter(resume_text: str, job_description: str,
+                                company_name: str, position: str,
+                                candidate_name: str) -> Dict[str, Any]:
+    """Fallback cover letter when APIs unavailable."""
+    
+    skills = _extract_skills(resume_text)
+    cover_letter = _build_demo_letter(skills, company_name, position, candidate_name)
+
     return {
         "success": True,
         "cover_letter": cover_letter,
@@ -9,6 +9,11 @@ Provides:
 """
 
 import os
+import time
+import hashlib
+import functools
+import threading
+from collections import OrderedDict
 import firebase_admin
 from firebase_admin import credentials, auth
 from fastapi import Request, HTTPException, status
@@ -28,6 +33,24 @@ else:
 # Track initialization status for better debugging
 _init_error = None
 
+@functools.cache
+def _build_cert_dict(project_id: str, client_email: str, private_key: str) -> dict:
+    """Sanitize the env credentials into a service-account dict (built once per value set)."""
+    # Fix line-break encoding for private key
+    fixed_private_key = private_key.replace("\\n", "\n")
+    # Strip potential wrapping quotes
+    if fixed_private_key.startswith('"') and fixed_private_key.endswith('"'):
+        fixed_private_key = fixed_private_key[1:-1]
+
+    return {
+        "type": "service_account",
+        "project_id": project_id,
+        "private_key": fixed_private_key,
+        "client_email": client_email,
+        "token_uri": "https://oauth2.googleapis.com/token",
+    }
+
+
 def _init_firebase():
     """
     Build Firebase credentials from environment variables safely.
@@ -54,21 +77,7 @@ def _init_firebase():
         return
 
     try:
-        # Fix line-break encoding for private key
-        fixed_private_key = private_key.replace("\\n", "\n")
-        # Strip potential wrapping quotes
-        if fixed_private_key.startswith('"') and fixed_private_key.endswith('"'):
-            fixed_private_key = fixed_private_key[1:-1]
-
-        cert_dict = {
-            "type": "service_account",
-            "project_id": project_id,
-            "private_key": fixed_private_key,
-            "client_email": client_email,
-            "token_uri": "https://oauth2.googleapis.com/token",
-        }
-
-        cert = credentials.Certificate(cert_dict)
+        cert = credentials.Certificate(_build_cert_dict(project_id, client_email, private_key))
         firebase_admin.initialize_app(cert)
         print("[Firebase] Admin SDK initialized ✓")
     except Exception as e:
@@ -82,6 +91,16 @@ _init_firebase()
 
 # ── Token Verification ───────────────────────────────────────────────────────
 
+# Verified tokens: {blake2b(token): (expires_at, user dict)}, LRU-bounded.
+# Entries live at most TOKEN_CACHE_TTL seconds and never past the token's
+# own expiry (minus a safety margin), so revocation lag stays bounded.
+TOKEN_CACHE_TTL = 300
+TOKEN_CACHE_SIZE = 10_000
+TOKEN_EXPIRY_MARGIN = 30
+_token_cache: "OrderedDict[bytes, tuple[float, dict]]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+
 def verify_firebase_token(token: str) -> dict:
     """
     Verify a Firebase ID token and return the decoded user payload.
@@ -101,9 +120,17 @@ def verify_firebase_token(token: str) -> dict:
             detail=f"Firebase not initialized: {_init_error}",
         )
 
+    key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+    now = time.time()
+    with _token_cache_lock:
+        hit = _token_cache.get(key)
+        if hit and hit[0] > now:
+            _token_cache.move_to_end(key)
+            return dict(hit[1])
+
     try:
         decoded = auth.verify_id_token(token)
-        return {
+        user = {
             "uid":     decoded.get("uid"),
             "name":    decoded.get("name", ""),
             "email":   decoded.get("email", ""),
@@ -123,9 +150,24 @@ def verify_firebase_token(token: str) -> dict:
             detail=f"Invalid or expired Firebase token: {str(e)}",
         )
 
+    # Only successful verifications are cached
+    expires_at = min(now + TOKEN_CACHE_TTL, decoded.get("exp", 0) - TOKEN_EXPIRY_MARGIN)
+    if expires_at > now:
+        with _token_cache_lock:
+            _token_cache[key] = (expires_at, user)
+            _token_cache.move_to_end(key)
+            if len(_token_cache) > TOKEN_CACHE_SIZE:
+                _token_cache.popitem(last=False)
+
+    return dict(user)
+
 
 # ── FastAPI Dependency ───────────────────────────────────────────────────────
 
+_BEARER = "Bearer "
+_BEARER_LEN = len(_BEARER)
+
+
 async def get_current_user(request: Request) -> dict:
     """
     FastAPI dependency — extracts and verifies the Firebase ID token
@@ -144,12 +186,11 @@ async def get_current_user(request: Request) -> dict:
     
     # 1. Try Authorization Header
     auth_header = request.headers.get("Authorization", "")
-    if auth_header.startswith("Bearer "):
-        token = auth_header.split(" ", 1)[1].strip()
+    if auth_header.startswith(_BEARER):
+        token = auth_header[_BEARER_LEN:].strip()
     
     # 2. Try 'firebase_token' Cookie (fallthrough for direct browser access)
-    if not token:
-        token = request.cookies.get("firebase_token")
+    token = token or request.cookies.get("firebase_token")
 
     if not token:
         raise HTTPException(
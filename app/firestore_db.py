@@ -9,18 +9,102 @@ Collections:
   - audit_logs  : user action history
 
 All functions are synchronous wrappers — Railway has no async Firestore client.
+get_admin_snapshot() is the exception: it runs the three collection reads
+in worker threads concurrently.
 """
 
+import asyncio
 from datetime import datetime, timezone
+from typing import Iterator
 from google.cloud.exceptions import NotFound
 from firebase_admin import firestore
 
 
 # ── Firestore Client ─────────────────────────────────────────────────────────
 
+_db = None
+
+
 def _get_db():
-    """Return (or lazily create) the Firestore client."""
-    return firestore.client()
+    """Return (or lazily create) the Firestore client, cached after the first call."""
+    global _db
+    if _db is None:
+        _db = firestore.client()
+    return _db
+
+
+def _to_dict(doc) -> dict:
+    """
+    Snapshot → dict, with Firestore timestamps rendered as ISO-8601 strings.
+
+    Timestamps are stored natively so they index and sort server-side;
+    callers and templates keep receiving the string form.
+    """
+    data = doc.to_dict()
+    for field, value in data.items():
+        if isinstance(value, datetime):
+            data[field] = value.isoformat()
+    return data
+
+
+def _newest_first(collection: str, field: str, limit: int | None) -> list[dict]:
+    """
+    Stream a collection ordered by `field` descending, optionally capped.
+
+    Every write path sets the ordering field, so documents missing it
+    (which Firestore drops from ordered queries) are not expected.
+    """
+    query = (
+        _get_db()
+        .collection(collection)
+        .order_by(field, direction=firestore.Query.DESCENDING)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return [_to_dict(doc) for doc in query.stream()]
+
+
+def make_cursor(record: dict, field: str) -> str:
+    """Paging cursor for the record after which the next page starts: "<ISO field>|<id>"."""
+    return f"{record[field]}|{record['id']}"
+
+
+def parse_cursor(cursor: str) -> tuple[datetime, str]:
+    """
+    Split a make_cursor() string into (timestamp, document id).
+
+    Raises:
+        ValueError: if the cursor is malformed.
+    """
+    value, sep, doc_id = cursor.rpartition("|")
+    if not sep or not doc_id or "/" in doc_id:
+        raise ValueError(f"Malformed cursor: {cursor!r}")
+    return datetime.fromisoformat(value), doc_id
+
+
+def _iter_user_docs(collection: str, field: str, uid: str, limit: int | None,
+                    start_after: str | None) -> Iterator[dict]:
+    """
+    Page through one user's documents ordered by `field` descending.
+
+    Ties on `field` are broken by document id, so start_after (a make_cursor
+    string from the last document of the previous page) never skips or
+    repeats documents that share a timestamp.
+    """
+    collection_ref = _get_db().collection(collection)
+    query = (
+        collection_ref
+        .where("uid", "==", uid)
+        .order_by(field, direction=firestore.Query.DESCENDING)
+        .order_by("__name__", direction=firestore.Query.DESCENDING)
+    )
+    if start_after:
+        value, doc_id = parse_cursor(start_after)
+        query = query.start_after({field: value, "__name__": collection_ref.document(doc_id)})
+    if limit is not None:
+        query = query.limit(limit)
+    for doc in query.stream():
+        yield _to_dict(doc)
 
 
 # ── Users Collection ─────────────────────────────────────────────────────────
@@ -29,6 +113,9 @@ def create_or_update_user(uid: str, name: str, email: str, picture: str) -> dict
     """
     Create the user document if it doesn't exist, or update name/email/picture.
 
+    Runs as one transaction: a single read decides whether created_at is
+    set, then a merge write. No trailing read-back.
+
     Fields:
         uid, name, email, profile_picture, created_at (only set on first write)
 
@@ -37,26 +124,27 @@ def create_or_update_user(uid: str, name: str, email: str, picture: str) -> dict
     """
     db = _get_db()
     ref = db.collection("users").document(uid)
-    doc = ref.get()
+    return _upsert_user(db.transaction(), ref, {
+        "uid":             uid,
+        "name":            name,
+        "email":           email,
+        "profile_picture": picture,
+    })
+
 
-    if doc.exists:
+@firestore.transactional
+def _upsert_user(transaction, ref, data: dict) -> dict:
+    # Only created_at is needed: everything else comes from `data`
+    snap = ref.get(field_paths=["created_at"], transaction=transaction)
+    if snap.exists:
         # Update mutable fields only
-        ref.update({
-            "name":            name,
-            "email":           email,
-            "profile_picture": picture,
-        })
-    else:
-        # First login — create full document
-        ref.set({
-            "uid":             uid,
-            "name":            name,
-            "email":           email,
-            "profile_picture": picture,
-            "created_at":      datetime.now(timezone.utc).isoformat(),
-        })
-
-    return ref.get().to_dict()
+        transaction.set(ref, data, merge=True)
+        return {**_to_dict(snap), **data}
+
+    # First login — create full document
+    now = datetime.now(timezone.utc)
+    transaction.set(ref, {**data, "created_at": now})
+    return {**data, "created_at": now.isoformat()}
 
 
 def delete_user(uid: str) -> bool:
@@ -66,6 +154,39 @@ def delete_user(uid: str) -> bool:
     return True
 
 
+def delete_user_cascade(uid: str) -> int:
+    """
+    Delete a user document together with their files and audit logs.
+
+    Deletes are grouped into WriteBatches of up to 500 operations; the
+    queries project no fields, so only document references come back.
+
+    Returns:
+        Number of documents deleted (including the user document).
+    """
+    db = _get_db()
+    batch = db.batch()
+    count = 0
+
+    for collection in ("files", "audit_logs"):
+        docs = db.collection(collection).where("uid", "==", uid).select([]).stream()
+        for doc in docs:
+            batch.delete(doc.reference)
+            count += 1
+            if count % 500 == 0:
+                batch.commit()
+                batch = db.batch()
+
+    batch.delete(db.collection("users").document(uid))
+    batch.commit()
+    return count + 1
+
+
+def user_exists(uid: str) -> bool:
+    """Check for a user document without fetching its fields."""
+    return _get_db().collection("users").document(uid).get(field_paths=["uid"]).exists
+
+
 def get_user(uid: str) -> dict | None:
     """
     Fetch a user document by uid.
@@ -75,7 +196,7 @@ def get_user(uid: str) -> dict | None:
     """
     db = _get_db()
     doc = db.collection("users").document(uid).get()
-    return doc.to_dict() if doc.exists else None
+    return _to_dict(doc) if doc.exists else None
 
 
 # ── Files Collection ─────────────────────────────────────────────────────────
@@ -93,57 +214,54 @@ def save_file_metadata(uid: str, file_name: str, file_url: str) -> dict:
     db = _get_db()
     ref = db.collection("files").document()  # auto-generated ID
 
+    now = datetime.now(timezone.utc)
     data = {
         "id":          ref.id,
         "uid":         uid,
         "file_name":   file_name,
         "file_url":    file_url,
-        "uploaded_at": datetime.now(timezone.utc).isoformat(),
     }
-    ref.set(data)
-    return data
+    ref.set({**data, "uploaded_at": now})
+    return {**data, "uploaded_at": now.isoformat()}
 
 
-def get_user_files(uid: str) -> list[dict]:
+def iter_user_files(uid: str, limit: int | None = None,
+                    start_after: str | None = None) -> Iterator[dict]:
     """
-    Return all file records for a given user, sorted newest-first.
+    Yield file records for a given user, newest-first, as Firestore streams them.
+
+    Args:
+        limit       : Maximum number of records to yield
+        start_after : make_cursor() of the last record already seen
+    """
+    return _iter_user_docs("files", "uploaded_at", uid, limit, start_after)
+
+
+def get_user_files(uid: str, limit: int | None = None,
+                   start_after: str | None = None) -> list[dict]:
+    """
+    Return file records for a given user, sorted newest-first.
 
     Returns:
         List of file dicts.
     """
-    db = _get_db()
-    docs = (
-        db.collection("files")
-        .where("uid", "==", uid)
-        .order_by("uploaded_at", direction=firestore.Query.DESCENDING)
-        .stream()
-    )
-    return [doc.to_dict() for doc in docs]
+    return list(iter_user_files(uid, limit, start_after))
 
 
-def get_all_users() -> list[dict]:
+def get_all_users(limit: int | None = None) -> list[dict]:
     """
-    Return all user profiles in the system.
-    Sorts by created_at in Python to ensure documents without the field are still returned.
+    Return user profiles in the system, newest first.
+    Firestore sorts on created_at server-side; pass limit to cap the payload.
     """
-    db = _get_db()
-    docs = db.collection("users").stream()
-    users = [doc.to_dict() for doc in docs]
-    # Sort by created_at desc, handle missing keys gracefully
-    users.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-    return users
+    return _newest_first("users", "created_at", limit)
 
 
-def get_all_files() -> list[dict]:
+def get_all_files(limit: int | None = None) -> list[dict]:
     """
-    Return all uploaded file records across all users.
-    Sorts by uploaded_at in Python to be resilient to missing fields.
+    Return uploaded file records across all users, newest first.
+    Firestore sorts on uploaded_at server-side; pass limit to cap the payload.
     """
-    db = _get_db()
-    docs = db.collection("files").stream()
-    files = [doc.to_dict() for doc in docs]
-    files.sort(key=lambda x: x.get("uploaded_at", ""), reverse=True)
-    return files
+    return _newest_first("files", "uploaded_at", limit)
 
 
 def delete_file(file_id: str) -> bool:
@@ -169,37 +287,74 @@ def save_audit_log(uid: str, action: str, details: str) -> None:
         "uid":       uid,
         "action":    action,       # e.g. "LOGIN", "UPLOAD_RESUME"
         "details":   details,      # e.g. filename or description
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": datetime.now(timezone.utc),
     })
 
 
-def get_audit_logs(uid: str) -> list[dict]:
+def save_audit_logs(entries: list[dict]) -> None:
     """
-    Return all audit log entries for a user, sorted newest-first.
+    Persist several audit log entries in one batched write (max 500).
+
+    Each entry carries uid, action, details and timestamp; the document id
+    is added here. Called by the buffered writer in audit.py.
+    """
+    db = _get_db()
+    batch = db.batch()
+    collection = db.collection("audit_logs")
+
+    for entry in entries:
+        ref = collection.document()
+        batch.set(ref, {"id": ref.id, **entry})
+
+    batch.commit()
+
+
+def iter_audit_logs(uid: str, limit: int | None = None,
+                    start_after: str | None = None) -> Iterator[dict]:
+    """
+    Yield audit log entries for a user, newest-first, as Firestore streams them.
+
+    Args:
+        limit       : Maximum number of entries to yield
+        start_after : make_cursor() of the last entry already seen
+    """
+    return _iter_user_docs("audit_logs", "timestamp", uid, limit, start_after)
+
+
+def get_audit_logs(uid: str, limit: int | None = None,
+                   start_after: str | None = None) -> list[dict]:
+    """
+    Return audit log entries for a user, sorted newest-first.
 
     Returns:
         List of audit log dicts.
     """
-    db = _get_db()
-    docs = (
-        db.collection("audit_logs")
-        .where("uid", "==", uid)
-        .order_by("timestamp", direction=firestore.Query.DESCENDING)
-        .stream()
-    )
-    return [doc.to_dict() for doc in docs]
+    return list(iter_audit_logs(uid, limit, start_after))
 
 
-def get_all_audit_logs() -> list[dict]:
+def get_all_audit_logs(limit: int | None = None) -> list[dict]:
     """
-    Return all audit log entries across the entire system.
+    Return audit log entries across the entire system, newest first.
+    Firestore sorts on timestamp server-side; pass limit to cap the payload.
     """
-    db = _get_db()
-    docs = db.collection("audit_logs").stream()
-    logs = [doc.to_dict() for doc in docs]
-    # Sort by timestamp desc, fallback to empty string
-    logs.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-    return logs
+    return _newest_first("audit_logs", "timestamp", limit)
+
+
+# ── Admin ────────────────────────────────────────────────────────────────────
+
+async def get_admin_snapshot() -> dict:
+    """
+    Fetch all users, files and audit logs concurrently for the admin views.
+
+    Returns:
+        {"users": [...], "files": [...], "audit_logs": [...]}
+    """
+    users, files, logs = await asyncio.gather(
+        asyncio.to_thread(get_all_users),
+        asyncio.to_thread(get_all_files),
+        asyncio.to_thread(get_all_audit_logs),
+    )
+    return {"users": users, "files": files, "audit_logs": logs}
 
 
 def delete_audit_log(log_id: str) -> bool:
@@ -207,3 +362,50 @@ def delete_audit_log(log_id: str) -> bool:
     db = _get_db()
     db.collection("audit_logs").document(log_id).delete()
     return True
+
+
+# ── Maintenance ──────────────────────────────────────────────────────────────
+
+# (collection, field) pairs that older code wrote as ISO-8601 strings
+_TIMESTAMP_FIELDS = (
+    ("users",      "created_at"),
+    ("files",      "uploaded_at"),
+    ("audit_logs", "timestamp"),
+)
+
+
+def backfill_timestamps() -> int:
+    """
+    Convert legacy ISO-string timestamps to native Firestore timestamps.
+
+    Firestore orders values by type before value, so string timestamps
+    would sort apart from native ones and never match a start_after cursor.
+    A range filter on "" only matches string values, which makes this safe
+    to re-run: converted documents drop out of the query. One-off migration,
+    run by an admin via POST /admin/backfill-timestamps.
+
+    Returns:
+        Number of documents updated.
+    """
+    db = _get_db()
+    updates = []
+
+    # Read every match before writing, so no batch commits mid-stream
+    for collection, field in _TIMESTAMP_FIELDS:
+        docs = db.collection(collection).where(field, ">=", "").select([field]).get()
+        for doc in docs:
+            try:
+                value = datetime.fromisoformat(doc.get(field))
+            except ValueError:
+                print(f"[Firestore] Skipping {collection}/{doc.id}: bad {field}")
+                continue
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            updates.append((doc.reference, {field: value}))
+
+    for start in range(0, len(updates), 500):
+        batch = db.batch()
+        for ref, data in updates[start:start + 500]:
+            batch.update(ref, data)
+        batch.commit()
+    return len(updates)
@@ -3,28 +3,90 @@ Job Search Module
 Generate job search URLs and AI-powered personalized job search strategy
 """
 
-import os
-import json
+import functools
 import urllib.parse
-from typing import Dict, List, Any
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Tuple
+
+import orjson
+
+
+# Built once at import; read-only views so callers cannot mutate module state
+_JOB_TIPS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "Frontend Developer": (
+        "Highlight React/Vue/Angular projects in your portfolio",
+        "Include GitHub profile with active contributions",
+        "Mention responsive design and accessibility experience"
+    ),
+    "Backend Developer": (
+        "Showcase API design and database experience",
+        "Mention scalability and performance optimizations",
+        "Include cloud platform experience (AWS/GCP/Azure)"
+    ),
+    "Data Analyst": (
+        "Highlight SQL and visualization tool proficiency",
+        "Include data storytelling examples",
+        "Mention business impact of your analyses"
+    ),
+    "Full Stack Developer": (
+        "Show end-to-end project experience",
+        "Highlight both frontend and backend technologies",
+        "Include deployment and DevOps experience"
+    ),
+    "Machine Learning Engineer": (
+        "Showcase ML projects with measurable results",
+        "Mention production ML system experience",
+        "Include research papers or Kaggle rankings"
+    ),
+    "DevOps Engineer": (
+        "Highlight CI/CD pipeline experience",
+        "Mention infrastructure-as-code tools",
+        "Include monitoring and incident response experience"
+    ),
+    "Product Manager": (
+        "Showcase product launches and metrics",
+        "Highlight cross-functional collaboration",
+        "Include user research experience"
+    ),
+    "UX Designer": (
+        "Include portfolio with case studies",
+        "Show user research methodology",
+        "Mention design system experience"
+    )
+})
+
+_DEFAULT_JOB_TIPS: Tuple[str, ...] = (
+    "Tailor your resume for each application",
+    "Research the company before applying",
+    "Follow up after submitting your application",
+)
+
+_ROLE_TITLES: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "Frontend Developer": ("UI Developer", "React Developer", "Web Developer", "JavaScript Developer", "UI Engineer"),
+    "Backend Developer": ("Server-Side Developer", "API Developer", "Python Developer", "Java Developer", "Software Engineer"),
+    "Full Stack Developer": ("Web Developer", "Software Engineer", "MERN Stack Developer", "Full Stack Engineer", "Application Developer"),
+    "Data Analyst": ("Business Analyst", "Data Scientist (Junior)", "Analytics Engineer", "BI Analyst", "Reporting Analyst"),
+    "Machine Learning Engineer": ("AI Engineer", "Data Scientist", "Deep Learning Engineer", "NLP Engineer", "ML Ops Engineer"),
+    "DevOps Engineer": ("Site Reliability Engineer", "Cloud Engineer", "Platform Engineer", "Infrastructure Engineer", "Build Engineer"),
+    "Product Manager": ("Associate PM", "Technical PM", "Product Owner", "Growth PM", "Digital Product Manager"),
+    "UX Designer": ("UI/UX Designer", "Product Designer", "Interaction Designer", "Visual Designer", "Design Researcher"),
+})
 
 
 def get_job_search_urls(target_role: str, skills: list = None) -> dict:
     """
     Generate job search URLs for major job platforms.
+    The URLs depend only on the role, so they are built once per role; each
+    caller gets its own copy to mutate. skills is accepted for compatibility.
     """
+    return {site: dict(info) for site, info in _build_urls(target_role).items()}
+
+
+@functools.lru_cache(maxsize=256)
+def _build_urls(target_role: str) -> dict:
     # Clean role name for URL
     role_encoded = urllib.parse.quote(target_role)
     
-    # Build skill keywords
-    skill_keywords = ""
-    if skills:
-        top_skills = skills[:3] if len(skills) > 3 else skills
-        skill_keywords = " ".join(top_skills)
-        skill_encoded = urllib.parse.quote(skill_keywords)
-    else:
-        skill_encoded = role_encoded
-    
     return {
         "linkedin": {
             "name": "LinkedIn Jobs",
@@ -63,56 +125,7 @@ def get_job_tips(target_role: str) -> list:
     """
     Get job search tips for the target role.
     """
-    tips = {
-        "Frontend Developer": [
-            "Highlight React/Vue/Angular projects in your portfolio",
-            "Include GitHub profile with active contributions",
-            "Mention responsive design and accessibility experience"
-        ],
-        "Backend Developer": [
-            "Showcase API design and database experience",
-            "Mention scalability and performance optimizations",
-            "Include cloud platform experience (AWS/GCP/Azure)"
-        ],
-        "Data Analyst": [
-            "Highlight SQL and visualization tool proficiency",
-            "Include data storytelling examples",
-            "Mention business impact of your analyses"
-        ],
-        "Full Stack Developer": [
-            "Show end-to-end project experience",
-            "Highlight both frontend and backend technologies",
-            "Include deployment and DevOps experience"
-        ],
-        "Machine Learning Engineer": [
-            "Showcase ML projects with measurable results",
-            "Mention production ML system experience",
-            "Include research papers or Kaggle rankings"
-        ],
-        "DevOps Engineer": [
-            "Highlight CI/CD pipeline experience",
-            "Mention infrastructure-as-code tools",
-            "Include monitoring and incident response experience"
-        ],
-        "Product Manager": [
-            "Showcase product launches and metrics",
-            "Highlight cross-functional collaboration",
-            "Include user research experience"
-        ],
-        "UX Designer": [
-            "Include portfolio with case studies",
-            "Show user research methodology",
-            "Mention design system experience"
-        ]
-    }
-    
-    default_tips = [
-        "Tailor your resume for each application",
-        "Research the company before applying",
-        "Follow up after submitting your application"
-    ]
-    
-    return tips.get(target_role, default_tips)
+    return list(_JOB_TIPS.get(target_role, _DEFAULT_JOB_TIPS))
 
 
 def generate_job_strategy(resume_text: str, target_role: str, 
@@ -122,16 +135,12 @@ def generate_job_strategy(resume_text: str, target_role: str,
     Use LLaMA to generate a personalized job search strategy based on the candidate's resume.
     """
     from api_key_pool import get_api_pool
-    pool = get_api_pool()
-    api_key = pool.get_key()
-    if not api_key:
-        api_key = os.environ.get("GROQ_API_KEY")
-    if not api_key:
+    if not get_api_pool().has_available_key():
         return get_demo_strategy(target_role, strengths)
     
     try:
-        from groq import Groq
-        client = Groq(api_key=api_key)
+        from llama_analyzer import cache_scope_key, call_llama, condense_resume, parse_llm_json
+        resume_context = condense_resume(resume_text, f"{target_role} skills responsibilities projects experience")
         
         system_prompt = """You are an expert career coach and job search strategist. 
 Analyze the candidate's resume and provide highly personalized job search advice.
@@ -140,10 +149,10 @@ Always respond with valid JSON only. No markdown formatting."""
         prompt = f"""Based on this resume, create a personalized job search strategy for a {target_role} role.
 
 RESUME:
-{resume_text[:4000]}
+{resume_context}
 
 {f"STRENGTHS: {strengths}" if strengths else ""}
-{f"SKILL GAPS: {json.dumps(skill_gaps)}" if skill_gaps else ""}
+{f"SKILL GAPS: {orjson.dumps(skill_gaps).decode()}" if skill_gaps else ""}
 
 Return a JSON object with this EXACT structure:
 {{
@@ -178,25 +187,9 @@ Return a JSON object with this EXACT structure:
 Make everything SPECIFIC to this candidate's actual resume content. Do NOT give generic advice."""
 
         print("Job Strategy: Generating personalized advice (LLaMA)...")
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=2048
-        )
-        
-        text = response.choices[0].message.content.strip()
-        if text.startswith("```json"):
-            text = text[7:]
-        if text.startswith("```"):
-            text = text[3:]
-        if text.endswith("```"):
-            text = text[:-3]
-        
-        strategy = json.loads(text.strip())
+        scope = cache_scope_key("job_strategy", resume_text, target_role,
+                                strengths or [], skill_gaps or {})
+        strategy = parse_llm_json(call_llama(prompt, system_prompt, cache_scope=scope))
         strategy["llm_powered"] = True
         print("✓ Job strategy generated (powered by LLaMA 3.3)")
         return strategy
@@ -209,19 +202,8 @@ Make everything SPECIFIC to this candidate's actual resume content. Do NOT give
 def get_demo_strategy(target_role: str, strengths: List[str] = None) -> Dict[str, Any]:
     """Fallback strategy when LLM is unavailable."""
     
-    role_titles = {
-        "Frontend Developer": ["UI Developer", "React Developer", "Web Developer", "JavaScript Developer", "UI Engineer"],
-        "Backend Developer": ["Server-Side Developer", "API Developer", "Python Developer", "Java Developer", "Software Engineer"],
-        "Full Stack Developer": ["Web Developer", "Software Engineer", "MERN Stack Developer", "Full Stack Engineer", "Application Developer"],
-        "Data Analyst": ["Business Analyst", "Data Scientist (Junior)", "Analytics Engineer", "BI Analyst", "Reporting Analyst"],
-        "Machine Learning Engineer": ["AI Engineer", "Data Scientist", "Deep Learning Engineer", "NLP Engineer", "ML Ops Engineer"],
-        "DevOps Engineer": ["Site Reliability Engineer", "Cloud Engineer", "Platform Engineer", "Infrastructure Engineer", "Build Engineer"],
-        "Product Manager": ["Associate PM", "Technical PM", "Product Owner", "Growth PM", "Digital Product Manager"],
-        "UX Designer": ["UI/UX Designer", "Product Designer", "Interaction Designer", "Visual Designer", "Design Researcher"]
-    }
-    
     return {
-        "alternative_titles": role_titles.get(target_role, [f"Junior {target_role}", f"Associate {target_role}"]),
+        "alternative_titles": list(_ROLE_TITLES.get(target_role, (f"Junior {target_role}", f"Associate {target_role}"))),
         "elevator_pitch": f"I'm a motivated professional targeting {target_role} roles, bringing a combination of technical skills and project experience.",
         "top_selling_points": [],
         "target_companies": [],
@@ -1,38 +1,102 @@
 import os
-import json
-from typing import Dict, List, Any, Optional
+import re
+import time
+import random
+import functools
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, NamedTuple, Optional
 from pathlib import Path
+import httpx
+import numpy as np
+import orjson
 from groq import Groq
-from fastembed import TextEmbedding
-import chromadb
-from chromadb.config import Settings
 import hashlib
 
+from semantic_cache import SEMANTIC_CACHE_ENABLED, SemanticCache, embed_prompt
+
+# fastembed is heavy (ONNX Runtime) and only the embedding helpers need it,
+# so it is imported on first use.
+
 
 # Initialize embedding model (Fast, lightweight, optimized for CPU)
 # Using BGE-Small (excellent quality, very small footprint)
 _embedding_model = None
-_chroma_client = None
+
+# One Groq client per API key, reused so the pooled HTTP connections stay alive
+_CLIENTS: Dict[str, Groq] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+# Near-duplicate prompt → response cache for call_llama (ENABLE_SEMANTIC_CACHE=1)
+_semantic_cache = SemanticCache()
+
+# Per-resume chunk indexes, keyed by blake2b(resume text), LRU-bounded
+RESUME_INDEX_CACHE_SIZE = 32
+_resume_indexes: "OrderedDict[str, ResumeIndex]" = OrderedDict()
+_RESUME_INDEXES_LOCK = threading.Lock()
+
+# Structured resume extractions, keyed by blake2b(resume text), LRU-bounded.
+# Cover letters and interview prep for the same resume reuse one extraction.
+RESUME_INFO_CACHE_SIZE = 64
+_resume_info_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_RESUME_INFO_LOCK = threading.Lock()
+
+# Normalized query embeddings, keyed by query text, LRU-bounded. Fixed
+# queries (e.g. the extraction profile query) are encoded once per worker.
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+_query_embeddings: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_QUERY_EMBEDDINGS_LOCK = threading.Lock()
+
+# ONNX Runtime intra-op threads for embedding (unset: let ONNX Runtime decide)
+EMBED_THREADS = int(os.environ["EMBED_THREADS"]) if os.environ.get("EMBED_THREADS") else None
+
+# Prompt budgets: how much resume / job description text is sent to the model.
+# Token caps apply when the tokenizer loads; the character caps are the fallback.
+RESUME_PROMPT_CHARS = 4000
+RESUME_PROMPT_TOKENS = 1200
+JD_PROMPT_CHARS = 2500
+JD_PROMPT_TOKENS = 700
+INTERVIEW_RESUME_CHARS = 5000
+INTERVIEW_RESUME_TOKENS = 1500
+
+# Tokenizer used to measure prompt text (the LLaMA-1 vocabulary never
+# undercounts LLaMA 3's larger one, so caps stay conservative)
+PROMPT_TOKENIZER = os.environ.get("PROMPT_TOKENIZER", "hf-internal-testing/llama-tokenizer")
+
+# Groq retries: attempts per call (at least one per pooled key) and the cap on
+# the jittered exponential backoff after a server or connection error
+LLAMA_MIN_ATTEMPTS = 3
+LLAMA_BACKOFF_CAP = 8.0
+
+# Output budget for structured resume extraction (the JSON fits well under it)
+EXTRACTION_MAX_TOKENS = 1024
+
+# Markdown code fences around a JSON reply (```json / ```JSON / ``` and the closing ```)
+_FENCE_RE = re.compile(r"^\s*```(?:json)?[ \t]*\n?|\n?```\s*$", re.IGNORECASE)
 
 def get_embedding_model():
     global _embedding_model
     if _embedding_model is None:
+        from fastembed import TextEmbedding
+
         # Use a custom cache directory that is likely to be writable (especially on Railway with volumes)
         # We put it in app/data/model_cache
         cache_dir = Path(__file__).parent / "data" / "model_cache"
         cache_dir.mkdir(parents=True, exist_ok=True)
         
         try:
-            # fastembed uses ONNX Runtime (much lighter than PyTorch)
+            # fastembed uses ONNX Runtime (much lighter than PyTorch); its
+            # BGE-Small build is the int8-quantized ONNX export
             _embedding_model = TextEmbedding(
                 model_name="BAAI/bge-small-en-v1.5",
-                cache_dir=str(cache_dir)
+                cache_dir=str(cache_dir),
+                threads=EMBED_THREADS,
             )
-            print(f"✓ Loaded fastembed model (BGE-Small) in {cache_dir}")
+            print(f"✓ Loaded fastembed model (BGE-Small, int8 ONNX) in {cache_dir}")
         except Exception as e:
             print(f"Error loading embedding model: {e}. Trying default.")
             try:
-                _embedding_model = TextEmbedding(cache_dir=str(cache_dir))
+                _embedding_model = TextEmbedding(cache_dir=str(cache_dir), threads=EMBED_THREADS)
             except Exception as e2:
                  print(f"Critical error: Could not load embedding model: {e2}")
                  # Last resort fallback (non-async mockup if absolutely necessary, but we need embeddings)
@@ -40,19 +104,8 @@ def get_embedding_model():
     return _embedding_model
 
 
-def get_chroma_client():
-    """Get ChromaDB client."""
-    global _chroma_client
-    if _chroma_client is None:
-        _chroma_client = chromadb.Client(Settings(
-            anonymized_telemetry=False,
-            is_persistent=False
-        ))
-    return _chroma_client
-
-
 def get_groq_client():
-    """Get Groq client using the API key pool."""
+    """Get the pooled Groq client for the next key from the API key pool."""
     from api_key_pool import get_api_pool
     pool = get_api_pool()
     api_key = pool.get_key()
@@ -60,116 +113,329 @@ def get_groq_client():
         api_key = os.environ.get("GROQ_API_KEY")
     if not api_key:
         raise ValueError("No API keys available")
-    return Groq(api_key=api_key)
+    return _get_client(api_key)
+
+
+def _get_client(api_key: str) -> Groq:
+    """Return the cached Groq client for this key, creating it on first use."""
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(api_key)
+        if client is None:
+            client = Groq(
+                api_key=api_key,
+                http_client=httpx.Client(
+                    limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+                    timeout=httpx.Timeout(60.0, connect=10.0),
+                ),
+            )
+            _CLIENTS[api_key] = client
+        return client
+
+
+def parse_llm_json(text: str) -> Any:
+    """
+    Parse a JSON reply from the model: strip code fences, and if the model
+    wrapped the JSON in prose, fall back to the outermost {...} / [...] span.
+    """
+    text = _FENCE_RE.sub("", text).strip()
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+        if not starts:
+            raise
+        start = min(starts)
+        end = text.rfind("}" if text[start] == "{" else "]")
+        if end <= start:
+            raise
+        return orjson.loads(text[start:end + 1])
+
+
+def _prompt_json(value: Any) -> str:
+    """Pretty-print structured data for a prompt (orjson, 2-space indent)."""
+    return orjson.dumps(value, option=orjson.OPT_INDENT_2).decode()
+
+
+@functools.cache
+def _prompt_tokenizer():
+    """Load the prompt tokenizer once; None if it is unavailable."""
+    try:
+        from tokenizers import Tokenizer
+        return Tokenizer.from_pretrained(PROMPT_TOKENIZER)
+    except Exception as e:
+        print(f"[LLaMA] Prompt tokenizer unavailable, capping by characters: {e}")
+        return None
+
+
+def truncate_to_tokens(text: str, max_tokens: int, max_chars: int) -> str:
+    """
+    Cut text to at most max_tokens tokens (at a token boundary of the
+    original text), or to max_chars characters if no tokenizer is available.
+    """
+    tokenizer = _prompt_tokenizer()
+    if tokenizer is None:
+        return text[:max_chars]
+    if len(text) <= max_tokens:  # a token spans at least one character
+        return text
+    encoding = tokenizer.encode(text, add_special_tokens=False)
+    if len(encoding.ids) <= max_tokens:
+        return text
+    return text[:encoding.offsets[max_tokens - 1][1]]
+
+
+def _resume_key(resume_text: str) -> str:
+    """Content key for per-resume caches: blake2b over the full text."""
+    return hashlib.blake2b(resume_text.encode("utf-8"), digest_size=16).hexdigest()
 
 
 def chunk_resume(resume_text: str, chunk_size: int = 500) -> List[str]:
     """Split resume into meaningful chunks for embedding."""
-    # Split by double newlines (sections)
+    # Split by double newlines (sections); dict keys dedupe in order
     sections = resume_text.split('\n\n')
     
-    chunks = []
-    current_chunk = ""
+    chunks: Dict[str, None] = {}
+    current: List[str] = []  # sections of the paragraph chunk being built
+    current_len = 0          # len("\n\n".join(current))
     
     for section in sections:
         section = section.strip()
         if not section:
             continue
-            
-        if len(current_chunk) + len(section) < chunk_size:
-            current_chunk += "\n\n" + section if current_chunk else section
+        
+        if current_len + len(section) < chunk_size:
+            current_len += len(section) + (2 if current else 0)
+            current.append(section)
         else:
-            if current_chunk:
-                chunks.append(current_chunk)
-            current_chunk = section
-    
-    if current_chunk:
-        chunks.append(current_chunk)
+            if current:
+                chunks["\n\n".join(current)] = None
+            current = [section]
+            current_len = len(section)
+        
+        # Also add single lines for granular matching; a one-line section
+        # is already covered by its paragraph chunk
+        lines = section.split('\n')
+        if len(lines) > 1:
+            for line in lines:
+                line = line.strip()
+                if len(line) > 30:  # Meaningful lines only
+                    chunks.setdefault(line, None)
     
-    # Also split by single newlines for granular matching
-    for section in sections:
-        lines = section.strip().split('\n')
-        for line in lines:
-            line = line.strip()
-            if len(line) > 30:  # Meaningful lines only
-                chunks.append(line)
+    if current:
+        chunks["\n\n".join(current)] = None
     
-    return list(set(chunks))  # Remove duplicates
+    return list(chunks)
 
 
-def create_resume_embeddings(resume_text: str, session_id: str) -> chromadb.Collection:
-    """Create embeddings for resume chunks and store in ChromaDB."""
-    model = get_embedding_model()
-    client = get_chroma_client()
-    
-    # Create unique collection name based on session
-    collection_name = f"resume_{session_id[:8]}"
-    
-    # Delete existing collection if exists
-    try:
-        client.delete_collection(collection_name)
-    except:
-        pass
-    
-    # Create new collection
-    collection = client.create_collection(
-        name=collection_name,
-        metadata={"description": "Resume chunks with embeddings"}
-    )
-    
-    # Chunk the resume
-    chunks = chunk_resume(resume_text)
-    
-    if not chunks:
-        return collection
-    
-    # Create embeddings (fastembed model.embed returns a generator)
-    # Convert to list of lists for ChromaDB
-    embeddings = [e.tolist() for e in list(model.embed(chunks))]
-    
-    # Add to collection
-    collection.add(
-        documents=chunks,
-        embeddings=embeddings,
-        ids=[f"chunk_{i}" for i in range(len(chunks))]
-    )
-    
-    return collection
+class ResumeIndex(NamedTuple):
+    """Resume chunks and their L2-normalized embeddings (one row per chunk)."""
+    chunks: List[str]
+    matrix: np.ndarray
 
 
-def semantic_search(collection: chromadb.Collection, query: str, n_results: int = 5) -> List[str]:
+def _embed_normalized(texts: List[str]) -> np.ndarray:
+    """Embed texts with the BGE model and L2-normalize each row."""
+    vecs = np.asarray(list(get_embedding_model().embed(texts)), dtype=np.float32)
+    norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vecs / norms
+
+
+def create_resume_embeddings(resume_text: str, session_id: str = None) -> ResumeIndex:
+    """
+    Chunk the resume and embed every chunk into an in-memory index.
+
+    A resume is only a few dozen chunks, so an exhaustive matrix product
+    beats a vector database here. Indexes are keyed by a hash of the full
+    resume text, so the same resume is chunked and encoded once.
+    session_id is accepted for compatibility but no longer used.
+    """
+    key = _resume_key(resume_text)
+    with _RESUME_INDEXES_LOCK:
+        index = _resume_indexes.get(key)
+        if index is not None:
+            _resume_indexes.move_to_end(key)
+            return index
+
+    chunks = chunk_resume(resume_text)
+    if chunks:
+        matrix = _embed_normalized(chunks)
+    else:
+        matrix = np.empty((0, 0), dtype=np.float32)
+    index = ResumeIndex(chunks, matrix)
+
+    with _RESUME_INDEXES_LOCK:
+        _resume_indexes[key] = index
+        _resume_indexes.move_to_end(key)
+        while len(_resume_indexes) > RESUME_INDEX_CACHE_SIZE:
+            _resume_indexes.popitem(last=False)
+
+    return index
+
+
+def _embed_queries(queries: List[str]) -> np.ndarray:
+    """Normalized embeddings for queries (one row each); only cache misses are encoded."""
+    with _QUERY_EMBEDDINGS_LOCK:
+        cached = [_query_embeddings.get(q) for q in queries]
+    misses = list(dict.fromkeys(q for q, vec in zip(queries, cached) if vec is None))
+    if misses:
+        fresh = dict(zip(misses, _embed_normalized(misses)))
+        with _QUERY_EMBEDDINGS_LOCK:
+            for q, vec in fresh.items():
+                vec.setflags(write=False)
+                _query_embeddings[q] = vec
+            while len(_query_embeddings) > QUERY_EMBEDDING_CACHE_SIZE:
+                _query_embeddings.popitem(last=False)
+        cached = [vec if vec is not None else fresh[q] for q, vec in zip(queries, cached)]
+    else:
+        with _QUERY_EMBEDDINGS_LOCK:
+            for q in queries:
+                if q in _query_embeddings:
+                    _query_embeddings.move_to_end(q)
+    return np.stack(cached)
+
+
+def semantic_search(index: ResumeIndex, query: str, n_results: int = 5) -> List[str]:
     """Search for relevant resume chunks using semantic similarity."""
-    model = get_embedding_model()
-    # model.embed returns a generator, even for a single query
-    query_embeddings = [e.tolist() for e in list(model.embed([query]))]
-    
-    results = collection.query(
-        query_embeddings=query_embeddings,
-        n_results=n_results
-    )
-    
-    return results['documents'][0] if results['documents'] else []
+    results = semantic_search_many(index, [query], n_results)
+    return results[0] if results else []
+
+
+def semantic_search_many(index: ResumeIndex, queries: List[str],
+                         n_results: int = 5) -> List[List[str]]:
+    """
+    Run several semantic searches at once: uncached queries are embedded in
+    one model.embed batch and all are scored with a single matrix product.
+    Returns one list of matching chunks per query, most similar first.
+    """
+    if not queries:
+        return []
+    k = min(n_results, len(index.chunks))
+    if k <= 0:
+        return [[] for _ in queries]
+
+    sims = index.matrix @ _embed_queries(queries).T  # (chunks, queries)
+    if k < len(index.chunks):
+        top = np.argpartition(-sims, k - 1, axis=0)[:k]
+    else:
+        top = np.broadcast_to(np.arange(k)[:, None], sims.shape).copy()
+
+    results = []
+    for q in range(sims.shape[1]):
+        rows = top[:, q]
+        rows = rows[np.argsort(-sims[rows, q])]
+        results.append([index.chunks[i] for i in rows])
+    return results
+
+
+def cache_scope_key(*parts: Any) -> str:
+    """Semantic cache scope for call_llama: blake2b over the given prompt inputs."""
+    raw = "\x1f".join(_prompt_json(p) if isinstance(p, (dict, list)) else str(p) for p in parts)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+# What a structured extraction needs from a resume; used to rank chunks
+_PROFILE_QUERY = "name contact summary projects experience skills education achievements"
 
 
-def call_llama(prompt: str, system_prompt: str = None) -> str:
+def condense_resume(resume_text: str, query: str = _PROFILE_QUERY,
+                    budget_chars: int = RESUME_PROMPT_CHARS) -> str:
+    """
+    Fit a resume into the prompt budget. Short resumes are returned as-is;
+    longer ones keep the chunks most similar to query (in resume order)
+    instead of being cut off at budget_chars, so late sections are not lost.
+    The result is then capped at RESUME_PROMPT_TOKENS.
+    """
+    if len(resume_text) <= budget_chars:
+        return truncate_to_tokens(resume_text, RESUME_PROMPT_TOKENS, budget_chars)
+    try:
+        index = create_resume_embeddings(resume_text)
+        ranked = semantic_search(index, query, len(index.chunks))
+    except Exception as e:
+        print(f"[LLaMA] Context selection unavailable: {e}")
+        return truncate_to_tokens(resume_text, RESUME_PROMPT_TOKENS, budget_chars)
+
+    picked: List[str] = []
+    used = 0
+    for chunk in ranked:
+        # Line chunks repeat text from their paragraph chunk: skip a line whose
+        # paragraph is already in, and let a paragraph replace its lines
+        if any(chunk in p for p in picked):
+            continue
+        children = [p for p in picked if p in chunk]
+        freed = sum(len(p) + 2 for p in children)
+        if used - freed + len(chunk) > budget_chars:
+            continue
+        picked = [p for p in picked if p not in children]
+        picked.append(chunk)
+        used += len(chunk) + 2 - freed
+    position = {chunk: i for i, chunk in enumerate(index.chunks)}
+    picked.sort(key=position.__getitem__)
+    context = "\n\n".join(picked) or resume_text
+    return truncate_to_tokens(context, RESUME_PROMPT_TOKENS, budget_chars)
+
+
+def call_llama(prompt: str, system_prompt: str = None,
+               max_tokens: int = 2048, json_mode: bool = False,
+               cache_scope: str = "") -> str:
     """
     Call LLaMA 3.3 via Groq API with automatic key rotation and retries.
+    json_mode asks Groq for a bare JSON object (no code fences).
+    Near-duplicate prompts are answered from the semantic cache
+    (ENABLE_SEMANTIC_CACHE=1), but only within the same cache_scope: the
+    embedding sees just the first 512 tokens, so inputs further down the
+    prompt (job description, company, role, ...) belong in the scope.
     """
-    from api_key_pool import get_api_pool
+    vec = None
+    scope = f"{max_tokens}|{json_mode}|{cache_scope}"
+    if SEMANTIC_CACHE_ENABLED:
+        try:
+            vec = embed_prompt(f"{system_prompt or ''}\n{prompt}")
+            hit = _semantic_cache.lookup(scope, vec)
+            if hit is not None:
+                print("[LLaMA] Semantic cache hit")
+                return hit
+        except Exception as e:
+            print(f"[LLaMA] Semantic cache unavailable: {e}")
+            vec = None
+
+    text = _call_llama_uncached(prompt, system_prompt, max_tokens, json_mode)
+    if vec is not None:
+        _semantic_cache.store(scope, vec, text)
+    return text
+
+
+def _call_llama_uncached(prompt: str, system_prompt: str = None,
+                         max_tokens: int = 2048, json_mode: bool = False) -> str:
+    """One Groq completion, rotating through pool keys on rate limits."""
+    response = _create_completion(prompt, system_prompt, max_tokens=max_tokens, json_mode=json_mode)
+    return response.choices[0].message.content
+
+
+def _create_completion(prompt: str, system_prompt: str = None,
+                       max_tokens: int = 2048, json_mode: bool = False):
+    """
+    Create a Groq chat completion. Rate-limited keys are rested for as long
+    as Groq's headers say and the next key is tried at once; server and
+    connection errors are retried after a jittered exponential backoff.
+    """
+    from api_key_pool import cooldown_from_headers, get_api_pool
     pool = get_api_pool()
     last_error = None
+    extra = {"response_format": {"type": "json_object"}} if json_mode else {}
     
-    # Try once for every key in the pool
-    for attempt in range(max(pool.total_keys, 1)):
+    # Try at least once for every key in the pool
+    for attempt in range(max(pool.total_keys, LLAMA_MIN_ATTEMPTS)):
         api_key = pool.get_key()
         if not api_key:
+            if pool.total_keys:
+                break  # every pooled key is cooling down
             # Fallback to env if pool is somehow empty
             api_key = os.environ.get("GROQ_API_KEY")
             if not api_key:
                 break
         
         try:
-            client = Groq(api_key=api_key)
+            client = _get_client(api_key)
             messages = []
             if system_prompt:
                 messages.append({"role": "system", "content": system_prompt})
@@ -179,11 +445,12 @@ def call_llama(prompt: str, system_prompt: str = None) -> str:
                 model="llama-3.3-70b-versatile",
                 messages=messages,
                 temperature=0.7,
-                max_tokens=2048
+                max_tokens=max_tokens,
+                **extra
             )
             
             pool.mark_success(api_key)
-            return response.choices[0].message.content
+            return response
             
         except Exception as e:
             last_error = e
@@ -191,18 +458,38 @@ def call_llama(prompt: str, system_prompt: str = None) -> str:
             
             # If it's a rate limit error, mark the key as limited and try the next one
             if "rate_limit" in error_msg or "429" in error_msg:
-                pool.mark_rate_limited(api_key, cooldown_seconds=60)
+                headers = getattr(getattr(e, "response", None), "headers", None)
+                pool.mark_rate_limited(api_key, cooldown_seconds=cooldown_from_headers(headers))
                 print(f"[LLaMA] Key ...{api_key[-6:]} rate-limited, rotating...")
                 continue
-            else:
-                # Other errors (auth, validation) shouldn't be retried with same logic
-                raise
+            
+            # Transient provider trouble: back off (full jitter) before retrying
+            status = getattr(e, "status_code", None) or 0
+            if status >= 500 or isinstance(e, httpx.TransportError) or "connection" in type(e).__name__.lower():
+                delay = random.uniform(0, min(LLAMA_BACKOFF_CAP, 0.5 * 2 ** attempt))
+                print(f"[LLaMA] Groq error ({e}), retrying in {delay:.1f}s...")
+                time.sleep(delay)
+                continue
+            
+            # Other errors (auth, validation) shouldn't be retried with same logic
+            raise
                 
     raise Exception(f"Failed to call LLaMA after trying available keys. Last error: {last_error}")
 
 
 def extract_resume_info_llama(resume_text: str) -> Dict[str, Any]:
-    """Use LLaMA to extract structured information from resume."""
+    """
+    Use LLaMA to extract structured information from resume.
+    Successful extractions are cached per resume, so later cover letters
+    and interview question sets skip this Groq call.
+    """
+    key = _resume_key(resume_text)
+    with _RESUME_INFO_LOCK:
+        hit = _resume_info_cache.get(key)
+        if hit is not None:
+            _resume_info_cache.move_to_end(key)
+            return dict(hit)
+    resume_text = condense_resume(resume_text)
     
     system_prompt = """You are an expert resume parser. Extract structured information from resumes accurately.
 Always respond with valid JSON only, no additional text."""
@@ -210,7 +497,7 @@ Always respond with valid JSON only, no additional text."""
     prompt = f"""Analyze this resume and extract the following information in JSON format:
 
 RESUME:
-{resume_text[:4000]}
+{resume_text}
 
 Return a JSON object with this exact structure:
 {{
@@ -252,24 +539,12 @@ Return a JSON object with this exact structure:
 
 Extract ONLY information present in the resume. Do not invent anything."""
 
+    response = ""
     try:
-        response = call_llama(prompt, system_prompt)
-        
-        # Robust JSON extraction
-        import re
-        json_match = re.search(r'(\{.*\})', response, re.DOTALL)
-        if json_match:
-            json_blob = json_match.group(1)
-        else:
-            json_blob = response.strip()
-            if json_blob.startswith("```json"):
-                json_blob = json_blob[7:]
-            if json_blob.startswith("```"):
-                json_blob = json_blob[3:]
-            if json_blob.endswith("```"):
-                json_blob = json_blob[:-3]
-        
-        return json.loads(json_blob.strip())
+        response = call_llama(prompt, system_prompt,
+                              max_tokens=EXTRACTION_MAX_TOKENS, json_mode=True,
+                              cache_scope=cache_scope_key("extract", key))
+        info = parse_llm_json(response)
         
     except Exception as e:
         print(f"LLaMA extraction error: {e}. Response was: {response[:200]}...")
@@ -283,8 +558,19 @@ Extract ONLY information present in the resume. Do not invent anything."""
             "summary": ""
         }
 
+    with _RESUME_INFO_LOCK:
+        _resume_info_cache[key] = info
+        _resume_info_cache.move_to_end(key)
+        if len(_resume_info_cache) > RESUME_INFO_CACHE_SIZE:
+            _resume_info_cache.popitem(last=False)
+    return dict(info)
+
+
+# Paragraph-splitting patterns for _format_cover_letter
+_GREETING_RE = re.compile(r'(Dear\s+(?:Hiring Manager|[^,]+),)')
+_CLOSING_RE = re.compile(r'\s+(Sincerely|Best regards|Regards|Yours truly|Warm regards|Thank you)', re.IGNORECASE)
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
 
-import re
 
 def _format_cover_letter(text: str) -> str:
     """Ensure the cover letter has proper paragraph breaks."""
@@ -305,9 +591,9 @@ def _format_cover_letter(text: str) -> str:
     
     # No newlines at all — need to split intelligently
     # Split after greeting
-    text = re.sub(r'(Dear\s+(?:Hiring Manager|[^,]+),)', r'\1\n\n', text)
+    text = _GREETING_RE.sub(r'\1\n\n', text)
     # Split before closing
-    text = re.sub(r'\s+(Sincerely|Best regards|Regards|Yours truly|Warm regards|Thank you)', r'\n\n\1', text, flags=re.IGNORECASE)
+    text = _CLOSING_RE.sub(r'\n\n\1', text)
     
     # Now split the body into paragraphs roughly every 3-4 sentences
     parts = text.split('\n\n')
@@ -318,7 +604,7 @@ def _format_cover_letter(text: str) -> str:
             continue
         # If a body paragraph is very long (>500 chars), split it
         if len(part) > 500:
-            sentences = re.split(r'(?<=[.!?])\s+', part)
+            sentences = _SENTENCE_SPLIT_RE.split(part)
             chunk = []
             chunk_len = 0
             for s in sentences:
@@ -341,14 +627,18 @@ def generate_cover_letter_llama(resume_text: str, job_description: str,
                                  candidate_name: str) -> Dict[str, Any]:
     """Generate deeply personalized cover letter using LLaMA (direct resume analysis)."""
 
+    # Condense once for this prompt; the extraction reuses the cached index
+    resume_snip = condense_resume(resume_text)
+    jd_snip = truncate_to_tokens(job_description, JD_PROMPT_TOKENS, JD_PROMPT_CHARS)
+
     # Extract structured info using LLaMA
     print("Cover Letter: Extracting resume details (LLaMA)...")
     resume_info = extract_resume_info_llama(resume_text)
 
     # Build rich context directly from structured info
-    projects_detail = json.dumps(resume_info.get("projects", []), indent=2)
-    experience_detail = json.dumps(resume_info.get("experience", []), indent=2)
-    skills_detail = json.dumps(resume_info.get("skills", {}), indent=2)
+    projects_detail = _prompt_json(resume_info.get("projects", []))
+    experience_detail = _prompt_json(resume_info.get("experience", []))
+    skills_detail = _prompt_json(resume_info.get("skills", {}))
     achievements = resume_info.get("achievements", [])
 
     system_prompt = """You are an elite cover letter writer who creates cover letters that get interviews.
@@ -364,7 +654,7 @@ ALWAYS respond with valid JSON only."""
     prompt = f"""Create a deeply personalized cover letter AND a match analysis for {candidate_name} applying to {company_name} for {position}.
 
 === FULL RESUME ===
-{resume_text[:4000]}
+{resume_snip}
 
 === STRUCTURED RESUME DATA ===
 
@@ -378,10 +668,10 @@ CANDIDATE'S SKILLS:
 {skills_detail}
 
 CANDIDATE'S ACHIEVEMENTS:
-{json.dumps(achievements, indent=2)}
+{_prompt_json(achievements)}
 
 === JOB DESCRIPTION ===
-{job_description[:2500]}
+{jd_snip}
 
 Return a JSON object with this EXACT structure:
 {{
@@ -409,18 +699,10 @@ Return a JSON object with this EXACT structure:
 
     try:
         print("Cover Letter: Generating personalized letter (LLaMA)...")
-        response = call_llama(prompt, system_prompt)
-        
-        # Clean response
-        response = response.strip()
-        if response.startswith("```json"):
-            response = response[7:]
-        if response.startswith("```"):
-            response = response[3:]
-        if response.endswith("```"):
-            response = response[:-3]
-        
-        result = json.loads(response.strip())
+        scope = cache_scope_key("cover_letter", resume_text, job_description,
+                                company_name, position, candidate_name)
+        response = call_llama(prompt, system_prompt, cache_scope=scope)
+        result = parse_llm_json(response)
         print("✓ Cover letter generated (powered by LLaMA 3.3)")
         
         # Post-process: ensure proper paragraph formatting
@@ -473,9 +755,9 @@ def generate_interview_questions_llama(resume_text: str, target_role: str,
     resume_info = extract_resume_info_llama(resume_text)
 
     # Build rich project context for the prompt directly from structured data
-    projects_detail = json.dumps(resume_info.get("projects", []), indent=2)
-    experience_detail = json.dumps(resume_info.get("experience", []), indent=2)
-    skills_detail = json.dumps(resume_info.get("skills", {}), indent=2)
+    projects_detail = _prompt_json(resume_info.get("projects", []))
+    experience_detail = _prompt_json(resume_info.get("experience", []))
+    skills_detail = _prompt_json(resume_info.get("skills", {}))
 
     system_prompt = """You are a senior technical interviewer at a top tech company. Your job is to generate 
 HIGHLY SPECIFIC and DEEPLY PERSONALIZED interview questions based on the candidate's actual resume.
@@ -493,7 +775,7 @@ Always respond with valid JSON only."""
     prompt = f"""Generate 10 deeply personalized interview questions for this candidate applying for a {target_role} role.
 
 === FULL RESUME TEXT ===
-{resume_text[:5000]}
+{truncate_to_tokens(resume_text, INTERVIEW_RESUME_TOKENS, INTERVIEW_RESUME_CHARS)}
 
 === STRUCTURED RESUME DATA ===
 
@@ -507,7 +789,7 @@ CANDIDATE'S SKILLS:
 {skills_detail}
 
 {f"IDENTIFIED STRENGTHS: {strengths}" if strengths else ""}
-{f"SKILL GAPS TO PROBE: {json.dumps(skill_gaps)}" if skill_gaps else ""}
+{f"SKILL GAPS TO PROBE: {orjson.dumps(skill_gaps).decode()}" if skill_gaps else ""}
 
 === QUESTION CATEGORIES (generate exactly this distribution) ===
 1. PROJECT DEEP-DIVE (4 questions): Ask about specific projects BY NAME. Probe:
@@ -543,25 +825,10 @@ Return a JSON array with exactly 10 questions:
 
     try:
         print("Interview Prep: Generating personalized questions (LLaMA)...")
-        response = call_llama(prompt, system_prompt)
-        
-        # Robust JSON extraction
-        import re
-        # Find the first [ and the last ] and everything in between
-        json_match = re.search(r'(\[.*\])', response, re.DOTALL)
-        if json_match:
-            questions_json = json_match.group(1)
-        else:
-            # Fallback to manual stripping if regex fails
-            questions_json = response.strip()
-            if questions_json.startswith("```json"):
-                questions_json = questions_json[7:]
-            if questions_json.startswith("```"):
-                questions_json = questions_json[3:]
-            if questions_json.endswith("```"):
-                questions_json = questions_json[:-3]
-        
-        questions = json.loads(questions_json.strip())
+        scope = cache_scope_key("interview", resume_text, target_role,
+                                strengths or [], skill_gaps or {})
+        response = call_llama(prompt, system_prompt, cache_scope=scope)
+        questions = parse_llm_json(response)
         print(f"✓ Generated {len(questions) if isinstance(questions, list) else 0} personalized interview questions")
         
         return {
@@ -585,21 +852,3 @@ Return a JSON array with exactly 10 questions:
             "llm_powered": False,
             "error": str(e)
         }
-
-
-# Main function to get interview questions (called by main.py)
-def get_interview_questions_with_analysis(resume_text: str, target_role: str,
-                                           strengths: List[str] = None,
-                                           skill_gaps: Dict = None) -> Dict[str, Any]:
-    """Main entry point for interview question generation."""
-    try:
-        return generate_interview_questions_llama(resume_text, target_role, strengths, skill_gaps)
-    except Exception as e:
-        # Fallback if Groq API fails
-        print(f"Falling back to basic mode: {e}")
-        return {
-            "resume_analysis": {"technologies": [], "projects": [], "companies": [], "key_achievements": []},
-            "personalized_questions": [],
-            "llm_powered": False,
-            "error": str(e)
-        }
@@ -6,6 +6,7 @@ Resume Analysis & Career Planning App
 import os
 import json
 import csv
+import asyncio
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -20,7 +21,7 @@ else:
     print("[Main] Relying on system environment variables / generic .env lookup.")
 
 from datetime import datetime
-from fastapi import FastAPI, Request, UploadFile, File, Form
+from fastapi import FastAPI, Request, UploadFile, File, Form, HTTPException, status
 from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
@@ -49,19 +50,26 @@ from firestore_db import (
     get_user,
     get_user_files,
     get_audit_logs,
-    get_all_users,
     get_all_files,
-    get_all_audit_logs,
+    get_admin_snapshot,
     delete_user,
+    delete_user_cascade,
     delete_file,
-    delete_audit_log
+    delete_audit_log,
+    backfill_timestamps,
+    make_cursor,
+    parse_cursor
 )
 from cloudinary_storage import upload_resume as cloudinary_upload
-from audit import log_action
+from audit import log_action, start_audit_writer, stop_audit_writer
 
 # Upload limits
 MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10 MB
 
+# /files and /audit paging
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
 ALLOWED_ROLES = [
     "Frontend Developer", "Backend Developer", "Full Stack Developer",
     "Data Analyst", "Data Engineer", "Machine Learning Engineer",
@@ -81,6 +89,18 @@ app = FastAPI(
     description="Agentic AI-powered resume analysis and career guidance"
 )
 
+@app.on_event("startup")
+async def startup():
+    """Start background workers."""
+    start_audit_writer()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Flush buffered audit logs before the worker exits."""
+    await stop_audit_writer()
+
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -281,8 +301,9 @@ async def jobs_page(request: Request):
     job_strategy = get_session_data(request, "job_strategy")
     
     if not job_strategy:
-        # Generate AI-powered job search strategy
-        job_strategy = generate_job_strategy(
+        # Generate AI-powered job search strategy (blocking Groq call, off the event loop)
+        job_strategy = await asyncio.to_thread(
+            generate_job_strategy,
             resume_text=resume_text,
             target_role=analysis.get("target_role", ""),
             strengths=analysis.get("strengths", []),
@@ -345,7 +366,8 @@ async def generate_resume_questions(
         # Log the generation request
         log_action(user['uid'], "GENERATE_AI_QUESTIONS", {"role": analysis.get("target_role")})
         
-        llm_analysis = get_interview_questions_with_analysis(
+        llm_analysis = await asyncio.to_thread(
+            get_interview_questions_with_analysis,
             resume_text,
             target_role=analysis.get("target_role", ""),
             strengths=analysis.get("strengths", []),
@@ -402,7 +424,7 @@ async def generate_cover_letter_route(
     
     try:
         # Generate cover letter using LLM
-        result = generate_cover_letter(
+        result = await generate_cover_letter(
             resume_text=resume_text,
             job_description=job_description,
             company_name=company_name,
@@ -567,9 +589,7 @@ async def admin_dashboard(
     admin: dict = Depends(get_current_admin)
 ):
     """Render the centralized administration dashboard."""
-    users = get_all_users()
-    files = get_all_files()
-    logs = get_all_audit_logs()
+    snapshot = await get_admin_snapshot()
     
     # Fetch feedback from CSV
     feedback_entries = []
@@ -588,9 +608,9 @@ async def admin_dashboard(
         {
             "request": request,
             "admin": admin,
-            "users": users,
-            "files": files,
-            "logs": logs,
+            "users": snapshot["users"],
+            "files": snapshot["files"],
+            "logs": snapshot["audit_logs"],
             "feedback": feedback_entries
         }
     )
@@ -603,7 +623,7 @@ async def admin_resumes(
     admin: dict = Depends(get_current_admin)
 ):
     """Legacy admin view updated to show live Firestore data."""
-    uploads = get_all_files()
+    uploads = await asyncio.to_thread(get_all_files)
     
     html = f"""
     <html>
@@ -641,10 +661,18 @@ async def admin_resumes(
 
 # ── DELETE /admin/delete-user/{uid} ──────────────────────────
 @app.delete("/admin/delete-user/{uid}")
-async def admin_delete_user(uid: str, admin: dict = Depends(get_current_admin)):
-    """Delete a user profile."""
-    delete_user(uid)
-    log_action(admin["uid"], "DELETE_USER", f"Deleted user {uid}")
+async def admin_delete_user(
+    uid: str,
+    cascade: bool = False,
+    admin: dict = Depends(get_current_admin),
+):
+    """Delete a user profile (and, with ?cascade=true, their files and logs)."""
+    if cascade:
+        deleted = await asyncio.to_thread(delete_user_cascade, uid)
+        log_action(admin["uid"], "DELETE_USER", f"Deleted user {uid} and {deleted - 1} related record(s)")
+    else:
+        delete_user(uid)
+        log_action(admin["uid"], "DELETE_USER", f"Deleted user {uid}")
     return {"status": "success"}
 
 
@@ -665,6 +693,15 @@ async def admin_delete_log(log_id: str, admin: dict = Depends(get_current_admin)
     return {"status": "success"}
 
 
+# ── POST /admin/backfill-timestamps ──────────────────────────
+@app.post("/admin/backfill-timestamps")
+async def admin_backfill_timestamps(admin: dict = Depends(get_current_admin)):
+    """One-off migration: convert legacy ISO-string timestamps to native ones."""
+    updated = await asyncio.to_thread(backfill_timestamps)
+    log_action(admin["uid"], "BACKFILL_TIMESTAMPS", f"Converted {updated} document(s)")
+    return {"status": "success", "updated": updated}
+
+
 # ── POST /verify-user ────────────────────────────────────────
 @app.post("/verify-user")
 async def verify_user(user: dict = Depends(get_current_user)):
@@ -700,20 +737,47 @@ async def upload_resume_route(
     return {"file_url": file_url}
 
 
+def _check_cursor(start_after: str | None):
+    """Reject a malformed paging cursor with 400 before it reaches Firestore."""
+    if not start_after:
+        return
+    try:
+        parse_cursor(start_after)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid start_after cursor."
+        )
+
+
 # ── GET /files ────────────────────────────────────────────────
 @app.get("/files")
-async def list_files(user: dict = Depends(get_current_user)):
-    """Return all uploaded resume records for the user."""
-    files = get_user_files(user["uid"])
-    return {"files": files}
+async def list_files(
+    limit: int = PAGE_SIZE,
+    start_after: str | None = None,
+    user: dict = Depends(get_current_user),
+):
+    """Return one page of uploaded resume records for the user, newest first."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    _check_cursor(start_after)
+    files = await asyncio.to_thread(get_user_files, user["uid"], limit, start_after)
+    next_cursor = make_cursor(files[-1], "uploaded_at") if len(files) == limit else None
+    return {"files": files, "next_cursor": next_cursor}
 
 
 # ── GET /audit ────────────────────────────────────────────────
 @app.get("/audit")
-async def list_audit_logs(user: dict = Depends(get_current_user)):
-    """Return audit log history for the user."""
-    logs = get_audit_logs(user["uid"])
-    return {"audit_logs": logs}
+async def list_audit_logs(
+    limit: int = PAGE_SIZE,
+    start_after: str | None = None,
+    user: dict = Depends(get_current_user),
+):
+    """Return one page of audit log history for the user, newest first."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    _check_cursor(start_after)
+    logs = await asyncio.to_thread(get_audit_logs, user["uid"], limit, start_after)
+    next_cursor = make_cursor(logs[-1], "timestamp") if len(logs) == limit else None
+    return {"audit_logs": logs, "next_cursor": next_cursor}
 
 
 # ============================================================
@@ -1,8 +1,12 @@
 """
 Prompts Module
-Contains all Groq/LLaMA prompts for the agentic resume analysis
+Contains all Groq/LLaMA prompts for the agentic resume analysis.
+Prompts are string.Template objects compiled once at import; fill them
+with .substitute(). JSON braces need no escaping.
 """
 
+from string import Template
+
 # System prompt for the career analysis agent
 SYSTEM_PROMPT = """You are an autonomous career analysis agent.
 Analyze a resume against a target job role.
@@ -13,72 +17,116 @@ Return clean JSON only."""
 
 
 # Prompt 1: Resume Understanding
-PROMPT_RESUME_UNDERSTANDING = """Analyze the following resume and extract key information.
+PROMPT_RESUME_UNDERSTANDING = Template("""Analyze the following resume and extract key information.
 
 RESUME:
-{resume_text}
+$resume_text
 
 Return a JSON object with the following structure (no markdown, just raw JSON):
-{{
+{
   "skills": ["list of technical and soft skills found"],
   "education_level": "highest education level (e.g., Bachelor's, Master's, PhD, High School)",
   "experience_level": "entry/junior/mid/senior based on years and roles",
   "strengths": ["key strengths identified from the resume"]
-}}"""
+}""")
 
 
 # Prompt 2: Role Fit Analysis
-PROMPT_ROLE_FIT_ANALYSIS = """Based on the resume summary and target job role, analyze the candidate's fit.
+PROMPT_ROLE_FIT_ANALYSIS = Template("""Based on the resume summary and target job role, analyze the candidate's fit.
 
 RESUME SUMMARY:
-Skills: {skills}
-Education: {education_level}
-Experience Level: {experience_level}
-Strengths: {strengths}
+Skills: $skills
+Education: $education_level
+Experience Level: $experience_level
+Strengths: $strengths
 
-TARGET ROLE: {target_role}
+TARGET ROLE: $target_role
 
 Return a JSON object with the following structure (no markdown, just raw JSON):
-{{
+{
   "role_fit_score": <number from 0-100>,
   "missing_core_skills": ["essential skills for this role that are missing"],
   "missing_supporting_skills": ["nice-to-have skills that are missing"],
   "analysis_notes": "brief explanation of the score and fit assessment"
-}}"""
+}""")
 
 
 # Prompt 3: Learning Roadmap
-PROMPT_LEARNING_ROADMAP = """Create a personalized learning roadmap based on the missing skills.
+PROMPT_LEARNING_ROADMAP = Template("""Create a personalized learning roadmap based on the missing skills.
 
-MISSING CORE SKILLS: {missing_core_skills}
-MISSING SUPPORTING SKILLS: {missing_supporting_skills}
-TARGET ROLE: {target_role}
+MISSING CORE SKILLS: $missing_core_skills
+MISSING SUPPORTING SKILLS: $missing_supporting_skills
+TARGET ROLE: $target_role
 
 Return a JSON object with the following structure (no markdown, just raw JSON):
-{{
+{
   "roadmap": [
-    {{
+    {
       "skill": "skill name",
       "priority": "High | Medium | Low",
       "estimated_time": "e.g., 2 weeks, 1 month",
       "expected_outcome": "what the candidate will be able to do after learning this"
-    }}
+    }
   ]
-}}
+}
 
 Order the roadmap by priority (High first, then Medium, then Low).
-Include 3-6 items maximum."""
+Include 3-6 items maximum.""")
 
 
 # Prompt 4: Reflection
-PROMPT_REFLECTION = """Review the analysis and roadmap to determine if the guidance is sufficient.
+PROMPT_REFLECTION = Template("""Review the analysis and roadmap to determine if the guidance is sufficient.
 
-ROLE FIT SCORE: {role_fit_score}
-LEARNING ROADMAP ITEMS: {roadmap_count}
-TARGET ROLE: {target_role}
+ROLE FIT SCORE: $role_fit_score
+LEARNING ROADMAP ITEMS: $roadmap_count
+TARGET ROLE: $target_role
 
 Return a JSON object with the following structure (no markdown, just raw JSON):
-{{
+{
   "status": "sufficient",
   "reason": "brief explanation of why this guidance is enough for the candidate"
-}}"""
+}""")
+
+
+# Fused prompt: all four steps in a single JSON-mode call
+PROMPT_FUSED_ANALYSIS = Template("""Analyze the following resume against the target job role in four steps and return every result in one JSON object.
+
+RESUME:
+$resume_text
+
+TARGET ROLE: $target_role
+
+Step 1 - Resume understanding: extract skills, highest education level, experience level and key strengths.
+Step 2 - Role fit: score the candidate's fit for the target role and list the missing essential and nice-to-have skills.
+Step 3 - Learning roadmap: cover the missing skills with 3-6 items, ordered by priority (High first, then Medium, then Low).
+Step 4 - Reflection: review the score and roadmap and decide whether the guidance is sufficient.
+
+Return a JSON object with the following structure (no markdown, just raw JSON):
+{
+  "resume_understanding": {
+    "skills": ["list of technical and soft skills found"],
+    "education_level": "highest education level (e.g., Bachelor's, Master's, PhD, High School)",
+    "experience_level": "entry/junior/mid/senior based on years and roles",
+    "strengths": ["key strengths identified from the resume"]
+  },
+  "role_fit_analysis": {
+    "role_fit_score": <number from 0-100>,
+    "missing_core_skills": ["essential skills for this role that are missing"],
+    "missing_supporting_skills": ["nice-to-have skills that are missing"],
+    "analysis_notes": "brief explanation of the score and fit assessment"
+  },
+  "learning_roadmap": {
+    "roadmap": [
+      {
+        "skill": "skill name",
+        "priority": "High | Medium | Low",
+        "estimated_time": "e.g., 2 weeks, 1 month",
+        "expected_outcome": "what the candidate will be able to do after learning this"
+      }
+    ]
+  },
+  "reflection": {
+    "status": "sufficient",
+    "reason": "brief explanation of why this guidance is enough for the candidate"
+  }
+}""")
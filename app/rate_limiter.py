@@ -1,10 +1,13 @@
 """
 Simple Rate Limiter
-Prevents spamming of expensive LLM endpoints.
+Prevents spamming of expensive LLM endpoints, and adaptively bounds
+concurrent outbound LLM calls (AIMDLimiter).
 """
 
 import time
+import asyncio
 from collections import defaultdict
+from contextlib import asynccontextmanager
 from fastapi import Request, HTTPException
 from functools import wraps
 
@@ -45,3 +48,59 @@ def rate_limit(requests: int, window_seconds: int):
             return await func(request, *args, **kwargs)
         return wrapper
     return decorator
+
+
+class AIMDLimiter:
+    """
+    Adaptive concurrency limit for outbound LLM calls.
+
+    Additive increase / multiplicative decrease: every fast success raises the
+    limit by `increase`, every 429 or 5xx multiplies it by `decrease`. The limit
+    converges on what the provider can sustain instead of letting all callers
+    hit it at once and exhaust every key together.
+
+    Usage:
+        limiter = AIMDLimiter()
+        async with limiter.slot():
+            response = await client.chat.completions.create(...)
+        await limiter.on_success(latency)   # or limiter.on_failure()
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32,
+                 increase: float = 0.5, decrease: float = 0.5,
+                 target_latency: float = 3.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.target_latency = target_latency
+        self._in_flight = 0
+        self._cond = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Wait until fewer than `limit` calls are in flight, then hold a slot."""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    async def on_success(self, latency: float):
+        """
+        Additive increase, only while the provider is answering quickly.
+        Waiters are woken so a raised limit admits them right away.
+        """
+        if latency <= self.target_latency:
+            async with self._cond:
+                self.limit = min(self.maximum, self.limit + self.increase)
+                self._cond.notify_all()
+
+    def on_failure(self):
+        """Multiplicative decrease after a 429 or server error."""
+        self.limit = max(self.minimum, self.limit * self.decrease)
@@ -47,7 +47,7 @@ def save_resume(
     
     # Generate unique filename
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    file_hash = hashlib.md5(file_bytes).hexdigest()[:8]
+    file_hash = hashlib.blake2b(file_bytes, digest_size=4).hexdigest()
     ext = Path(original_filename).suffix.lower() or ".pdf"
     
     # Clean the detected name for filename
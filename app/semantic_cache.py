@@ -0,0 +1,72 @@
+"""
+Semantic Response Cache
+Near-duplicate LLM prompts (cosine similarity >= threshold) reuse a stored
+response instead of making another Groq call. Prompts are embedded with the
+shared BGE model from llama_analyzer; vectors live in one preallocated
+in-memory matrix, so a lookup is a single matrix-vector product.
+
+BGE-Small only reads the first 512 tokens of a prompt, so anything that
+must match exactly (model settings, target role, job description, ...) goes
+into the lookup scope; the embedding only matches within that scope.
+
+Opt-in with ENABLE_SEMANTIC_CACHE=1 (see agent.call_llm and
+llama_analyzer.call_llama).
+"""
+
+import os
+import threading
+
+import numpy as np
+
+SEMANTIC_CACHE_ENABLED = os.environ.get("ENABLE_SEMANTIC_CACHE", "") == "1"
+SEMANTIC_CACHE_THRESHOLD = 0.95
+SEMANTIC_CACHE_SIZE = 512
+
+
+def embed_prompt(prompt: str) -> np.ndarray:
+    """Embed a prompt with the shared BGE model and L2-normalize it."""
+    from llama_analyzer import get_embedding_model
+    vec = np.asarray(next(iter(get_embedding_model().embed([prompt]))), dtype=np.float32)
+    return vec / (np.linalg.norm(vec) or 1.0)
+
+
+class SemanticCache:
+    """
+    Thread-safe, bounded store of (scope, normalized prompt embedding, response).
+    Once full, each new entry overwrites the oldest one.
+    """
+
+    def __init__(self, threshold: float = SEMANTIC_CACHE_THRESHOLD,
+                 size: int = SEMANTIC_CACHE_SIZE):
+        self.threshold = threshold
+        self.size = size
+        self._vectors: np.ndarray | None = None  # (size, dim), allocated on first store
+        self._scopes: list[str | None] = [None] * size
+        self._responses: list[str | None] = [None] * size
+        self._next = 0  # slot the next store writes
+        self._lock = threading.Lock()
+
+    def lookup(self, scope: str, vec: np.ndarray) -> str | None:
+        """Return the response of the most similar prompt in scope above the threshold."""
+        with self._lock:
+            if self._vectors is None:
+                return None
+            rows = [i for i, s in enumerate(self._scopes) if s == scope]
+            if not rows:
+                return None
+            scores = self._vectors[rows] @ vec
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                return self._responses[rows[best]]
+        return None
+
+    def store(self, scope: str, vec: np.ndarray, text: str):
+        """Add a prompt embedding and its response under scope."""
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.size, vec.shape[0]), dtype=np.float32)
+            i = self._next
+            self._vectors[i] = vec
+            self._scopes[i] = scope
+            self._responses[i] = text
+            self._next = (i + 1) % self.size